@@ -0,0 +1,434 @@
+'''
+parts of AGTools that need neither maya nor qt, so they can be imported and
+tested outside maya
+'''
+import numpy as np
+
+
+def resolve_name_conflict(name, occupied):
+    '''
+    first free name in occupied, incrementing the trailing number like maya does
+    '''
+    if name not in occupied:
+        return name
+    base = name.rstrip('0123456789')
+    digits = name[len(base):]
+    padding = len(digits)
+    number = int(digits) + 1 if digits else 1
+    while True:
+        new_name = '{}{}'.format(base, str(number).zfill(padding))
+        if new_name not in occupied:
+            return new_name
+        number += 1
+
+def plan_renames(rename_items, sibling_names):
+    '''
+    rename_items : [{'uid', 'parent', 'name', 'new_name'}, ...]
+    sibling_names : {parent: set of child names currently in the scene}
+    
+    resolves collisions up front (writes the final name back to new_name) and
+    returns [(uid, name), ...] steps in an order where no step ever clashes,
+    cycles like A->B, B->A go through a temporary name
+    '''
+    batch_names = {}
+    for item in rename_items:
+        batch_names.setdefault(item['parent'], set()).add(item['name'])
+    
+    # names held by nodes outside the batch or by batch nodes that keep their name
+    occupied = {}
+    for parent in batch_names:
+        occupied[parent] = set(sibling_names.get(parent, ())) - batch_names[parent]
+    for item in rename_items:
+        if item['new_name'] == item['name']:
+            occupied[item['parent']].add(item['name'])
+    
+    pending = []
+    for item in rename_items:
+        if item['new_name'] == item['name']:
+            continue
+        item['new_name'] = resolve_name_conflict(item['new_name'], occupied[item['parent']])
+        occupied[item['parent']].add(item['new_name'])
+        if item['new_name'] != item['name']:
+            pending.append(item)
+    
+    # every pending node waits for at most one batch node to free its target name
+    holders = {(item['parent'], item['name']): item['uid'] for item in pending}
+    blocked_by = {}
+    waiting = {}
+    for item in pending:
+        holder = holders.get((item['parent'], item['new_name']))
+        if holder:
+            blocked_by[item['uid']] = holder
+            waiting[holder] = item['uid']
+    
+    items = {item['uid']: item for item in pending}
+    steps = []
+    done = set()
+    
+    def release(uid):
+        while uid and uid not in done:
+            steps.append((uid, items[uid]['new_name']))
+            done.add(uid)
+            uid = waiting.get(uid)
+    
+    for item in pending:
+        if item['uid'] not in blocked_by:
+            release(item['uid'])
+    
+    # whatever is left belongs to a cycle
+    for item in pending:
+        uid = item['uid']
+        if uid in done:
+            continue
+        parent = item['parent']
+        temp_name = resolve_name_conflict('{}_tmp'.format(item['name']), occupied[parent] | batch_names[parent])
+        occupied[parent].add(temp_name)
+        steps.append((uid, temp_name))
+        done.add(uid)
+        release(waiting.get(uid))
+        steps.append((uid, item['new_name']))
+    
+    return steps
+
+def nearest_face_axis(bbox_min, bbox_max, matrices, pivots):
+    '''
+    axis index (0=x, 1=y, 2=z) of the bounding box face closest to the pivot,
+    for every object at once
+    '''
+    bbox_min = np.asarray(bbox_min, dtype=float).reshape(-1, 3)
+    bbox_max = np.asarray(bbox_max, dtype=float).reshape(-1, 3)
+    matrices = np.asarray(matrices, dtype=float).reshape(-1, 4, 4)
+    pivots = np.asarray(pivots, dtype=float).reshape(-1, 3)
+    
+    # face centers in object space, ordered -x, +x, -y, +y, -z, +z
+    face_centers = np.repeat(((bbox_min + bbox_max) * 0.5)[:, np.newaxis, :], 6, axis=1)
+    for axis in range(3):
+        face_centers[:, axis*2, axis] = bbox_min[:, axis]
+        face_centers[:, axis*2+1, axis] = bbox_max[:, axis]
+    face_centers = np.concatenate([face_centers, np.ones(face_centers.shape[:2] + (1,))], axis=2)
+    
+    # maya matrices use row vectors, so points are multiplied on the left
+    world_centers = np.einsum('nfi,nij->nfj', face_centers, matrices)[:, :, :3]
+    distances = np.linalg.norm(world_centers - pivots[:, np.newaxis, :], axis=2)
+    return np.argmin(distances, axis=1) // 2
+
+class MeshTopology(object):
+    '''
+    edge/face/vertex adjacency of one mesh read once into flat arrays, loops
+    and rings are walked in this graph instead of growing the maya selection
+    
+    edge_vertices is an (edges, 2) array, faces are given as a flat list of
+    edge ids plus the number of edges per face, everything else is derived
+    as offset/index pairs so the lookups stay numpy slices
+    '''
+    
+    def __init__(self, edge_vertices, face_edge_counts, face_edges):
+        self.edge_vertices = np.asarray(edge_vertices, dtype=np.int32).reshape(-1, 2)
+        face_edge_counts = np.asarray(face_edge_counts, dtype=np.int32)
+        self.face_edge_ids = np.asarray(face_edges, dtype=np.int32)
+        self.num_edges = len(self.edge_vertices)
+        self.num_faces = len(face_edge_counts)
+        self.num_vertices = int(self.edge_vertices.max()) + 1 if self.num_edges else 0
+        
+        self.face_edge_offsets = np.zeros(self.num_faces + 1, dtype=np.int64)
+        np.cumsum(face_edge_counts, out=self.face_edge_offsets[1:])
+        
+        face_ids = np.repeat(np.arange(self.num_faces, dtype=np.int32), face_edge_counts)
+        order = np.argsort(self.face_edge_ids, kind='stable')
+        self.edge_face_ids = face_ids[order]
+        self.edge_face_offsets = np.zeros(self.num_edges + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.face_edge_ids, minlength=self.num_edges), out=self.edge_face_offsets[1:])
+        
+        flat_vertices = self.edge_vertices.ravel()
+        order = np.argsort(flat_vertices, kind='stable')
+        self.vertex_edge_ids = (order // 2).astype(np.int32)
+        self.vertex_edge_offsets = np.zeros(self.num_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(flat_vertices, minlength=self.num_vertices), out=self.vertex_edge_offsets[1:])
+        
+        # loop and ring ids are filled one walk at a time as edges are queried
+        self.loop_ids = np.full(self.num_edges, -1, dtype=np.int32)
+        self.ring_ids = np.full(self.num_edges, -1, dtype=np.int32)
+        self.loops = []
+        self.rings = []
+        
+    @classmethod
+    def from_faces(cls, faces):
+        '''
+        build from face vertex lists, edges are numbered in order of first use
+        '''
+        edge_ids = {}
+        edge_vertices = []
+        face_edges = []
+        for face in faces:
+            for vertex, next_vertex in zip(face, list(face[1:]) + [face[0]]):
+                key = (min(vertex, next_vertex), max(vertex, next_vertex))
+                if key not in edge_ids:
+                    edge_ids[key] = len(edge_vertices)
+                    edge_vertices.append(key)
+                face_edges.append(edge_ids[key])
+        return cls(edge_vertices, [len(face) for face in faces], face_edges)
+        
+    def face_edges(self, face):
+        return self.face_edge_ids[self.face_edge_offsets[face]:self.face_edge_offsets[face + 1]].tolist()
+        
+    def edge_faces(self, edge):
+        return self.edge_face_ids[self.edge_face_offsets[edge]:self.edge_face_offsets[edge + 1]].tolist()
+        
+    def vertex_edges(self, vertex):
+        return self.vertex_edge_ids[self.vertex_edge_offsets[vertex]:self.vertex_edge_offsets[vertex + 1]].tolist()
+        
+    def other_vertex(self, edge, vertex):
+        vertex_a, vertex_b = self.edge_vertices[edge]
+        return int(vertex_b) if vertex_a == vertex else int(vertex_a)
+        
+    def next_loop_edge(self, edge, vertex):
+        '''
+        the edge continuing the loop of edge through vertex, None at poles and
+        at the end of a border
+        '''
+        edges = self.vertex_edges(vertex)
+        faces = self.edge_faces(edge)
+        if len(faces) == 2 and len(edges) == 4:
+            for other in edges:
+                if other != edge and not set(faces).intersection(self.edge_faces(other)):
+                    return other
+        elif len(faces) == 1 and len(edges) == 3:
+            for other in edges:
+                if other != edge and len(self.edge_faces(other)) == 1:
+                    return other
+        return None
+        
+    def opposite_edge(self, face, edge):
+        '''
+        the edge across a quad from edge, None for tris and ngons
+        '''
+        edges = self.face_edges(face)
+        if len(edges) != 4:
+            return None
+        vertices = set(self.edge_vertices[edge].tolist())
+        for other in edges:
+            if not vertices.intersection(self.edge_vertices[other].tolist()):
+                return other
+        return None
+        
+    def walk(self, start, directions, step):
+        '''
+        follow step from start in each direction until it stops or comes back
+        
+        step(state) returns (component, next_state) or None, returns the
+        components in both directions and whether the walk is closed, a
+        closed walk lists the full cycle forward and reversed backward
+        '''
+        sequences = []
+        for state in directions[:2]:
+            sequence = []
+            visited = set([start])
+            result = step(state)
+            while result is not None:
+                component, state = result
+                if component == start:
+                    sequence.append(start)
+                    break
+                if component in visited:
+                    break
+                visited.add(component)
+                sequence.append(component)
+                result = step(state)
+            if sequence and sequence[-1] == start:
+                forward = sequence[:-1]
+                return forward, forward[::-1], True
+            sequences.append(sequence)
+        while len(sequences) < 2:
+            sequences.append([])
+        return sequences[0], sequences[1], False
+        
+    def edge_loop(self, edge):
+        def step(state):
+            current, vertex = state
+            next_edge = self.next_loop_edge(current, vertex)
+            if next_edge is None:
+                return None
+            return next_edge, (next_edge, self.other_vertex(next_edge, vertex))
+        return self.walk(edge, [(edge, int(vertex)) for vertex in self.edge_vertices[edge]], step)
+        
+    def edge_ring(self, edge):
+        def step(state):
+            current, face = state
+            next_edge = self.opposite_edge(face, current)
+            if next_edge is None:
+                return None
+            faces = [other for other in self.edge_faces(next_edge) if other != face]
+            return next_edge, (next_edge, faces[0] if faces else None)
+        def ring_step(state):
+            return step(state) if state[1] is not None else None
+        return self.walk(edge, [(edge, face) for face in self.edge_faces(edge)], ring_step)
+        
+    def face_loop(self, face, edge):
+        '''
+        faces in line with face, leaving it through edge and its opposite edge
+        '''
+        def step(state):
+            current, from_face = state
+            faces = [other for other in self.edge_faces(current) if other != from_face]
+            if not faces:
+                return None
+            next_edge = self.opposite_edge(faces[0], current)
+            if next_edge is None:
+                return None
+            return faces[0], (next_edge, faces[0])
+        directions = [(edge, face)]
+        opposite = self.opposite_edge(face, edge)
+        if opposite is not None:
+            directions.append((opposite, face))
+        return self.walk(face, directions, step)
+        
+    def vertex_loop(self, vertex, edge):
+        '''
+        vertices along the edge loop through vertex that contains edge
+        '''
+        def step(state):
+            current, from_vertex = state
+            if current is None:
+                return None
+            next_vertex = self.other_vertex(current, from_vertex)
+            return next_vertex, (self.next_loop_edge(current, next_vertex), next_vertex)
+        return self.walk(vertex, [(edge, vertex), (self.next_loop_edge(edge, vertex), vertex)], step)
+        
+    def loop(self, edge):
+        '''
+        sorted edge ids of the loop through edge
+        '''
+        return self.labelled_walk(edge, self.loop_ids, self.loops, self.edge_loop)
+        
+    def ring(self, edge):
+        '''
+        sorted edge ids of the ring through edge
+        '''
+        return self.labelled_walk(edge, self.ring_ids, self.rings, self.edge_ring)
+        
+    def labelled_walk(self, edge, ids, members, walk_func):
+        if ids[edge] < 0:
+            forward, backward, closed = walk_func(edge)
+            edges = np.unique(np.array([edge] + forward + backward, dtype=np.int32))
+            # an edge can sit on a border loop and a loop ending at it, keep
+            # the first id so every loop stays a complete walk
+            ids[edges[ids[edges] < 0]] = len(members)
+            ids[edge] = len(members)
+            members.append(edges)
+        return members[ids[edge]]
+        
+    def to_edges(self, kind, indices, border=False):
+        '''
+        sorted edge ids touching the given vertices, faces or edges, border
+        keeps only the edges on the outline of a face region
+        '''
+        indices = np.asarray(indices, dtype=np.int64)
+        if kind == 'e':
+            return np.unique(indices).astype(np.int32)
+        if kind == 'f':
+            edges = gather(self.face_edge_offsets, self.face_edge_ids, indices)
+            if border:
+                edges, counts = np.unique(edges, return_counts=True)
+                return edges[counts == 1]
+            return np.unique(edges)
+        return np.unique(gather(self.vertex_edge_offsets, self.vertex_edge_ids, indices))
+        
+    def grow_ring(self, edges):
+        '''
+        edges plus the edges facing them across each neighbouring quad
+        '''
+        grown = set(int(edge) for edge in edges)
+        for edge in list(grown):
+            for face in self.edge_faces(edge):
+                opposite = self.opposite_edge(face, edge)
+                if opposite is not None:
+                    grown.add(opposite)
+        return np.array(sorted(grown), dtype=np.int32)
+        
+    def walks(self, kind, component, op='l'):
+        '''
+        every loop (and ring for edges) running through component
+        '''
+        if kind == 'e':
+            walks = [self.edge_loop(component), self.edge_ring(component)]
+            return walks[::-1] if op == 'r' else walks
+        if kind == 'f':
+            edges = self.face_edges(component)
+            return [self.face_loop(component, edge) for edge in edges[:2]]
+        walks = []
+        members = []
+        for edge in self.vertex_edges(component):
+            walk = self.vertex_loop(component, edge)
+            member = set(walk[0] + walk[1])
+            if member not in members:
+                members.append(member)
+                walks.append(walk)
+        return walks
+
+def gather(offsets, ids, indices):
+    '''
+    concatenated ids[offsets[i]:offsets[i + 1]] for every i in indices
+    '''
+    starts = offsets[indices]
+    counts = offsets[indices + 1] - starts
+    if not len(counts):
+        return ids[:0]
+    skips = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return ids[skips + np.arange(counts.sum())]
+
+def walk_distance(walk, component):
+    forward, backward, closed = walk
+    distances = []
+    for sequence in (forward, backward):
+        if component in sequence:
+            distances.append(sequence.index(component) + 1)
+    return min(distances) if distances else None
+
+def checker_pattern(start, walk, spacing):
+    '''
+    start and every spacing-th component away from it in both directions of
+    walk, a closed walk counts the shorter way round like a growing selection
+    '''
+    forward, backward, closed = walk
+    pattern = [start]
+    if closed:
+        length = len(forward) + 1
+        for position, component in enumerate(forward, 1):
+            if min(position, length - position) % spacing == 0:
+                pattern.append(component)
+        return pattern
+    for sequence in (forward, backward):
+        pattern.extend(sequence[spacing - 1::spacing])
+    return pattern
+
+def checker_components(topology, kind, components, op='l', spacing=1):
+    '''
+    checker pattern for the selected component indices of one mesh
+    
+    one component checks along its loop (or ring with op 'r') every
+    spacing + 1, two components take the spacing from their distance and
+    a whole loop missing two components is checkered inverted from the gap,
+    returns None when the selection does not line up
+    '''
+    walks = topology.walks(kind, components[0], op)
+    if len(components) == 1:
+        return checker_pattern(components[0], walks[0], spacing + 1)
+    if len(components) == 2:
+        for walk in walks:
+            distance = walk_distance(walk, components[1])
+            if distance:
+                return checker_pattern(components[0], walk, distance)
+        return None
+    selected = set(components)
+    for walk in walks:
+        members = set(walk[0] + walk[1])
+        members.add(components[0])
+        missing = sorted(members - selected)
+        if not missing:
+            return checker_pattern(components[0], walk, 2)
+        if len(missing) == 2:
+            for gap_walk in topology.walks(kind, missing[0], op):
+                distance = walk_distance(gap_walk, missing[1])
+                if distance and set(gap_walk[0] + gap_walk[1] + [missing[0]]) == members:
+                    return sorted(members - set(checker_pattern(missing[0], gap_walk, distance)))
+    return None
@@ -4,19 +4,25 @@ from PySide2 import QtWidgets
 from shiboken2 import getCppPointer
 from shiboken2 import wrapInstance
 from functools import partial
+from collections import namedtuple
 
 import re
 import sys
 import maya.OpenMayaUI as omui
 import maya.cmds as mc
+import maya.mel as mel
+import maya.api.OpenMaya as om
+import maya.utils
 import os
 import json
+import time
+import concurrent.futures
+import numpy as np
+from agt_core import plan_renames, nearest_face_axis, MeshTopology, checker_components
 
 AGTools = 'AGTools_0.53'
 
 available_color_spaces = re.compile(r'sRGB|ACEScg|raw', re.IGNORECASE)
-COLOR_SPACES = cmds.colorManagementPrefs(q=True, inputSpaceNames=True)
-FILTERED_COLOR_SPACES = [space for space in COLOR_SPACES if available_color_spaces.search(space)]
 
 maya_script_dir = '{}/scripts'.format(os.environ['MAYA_APP_DIR'].split(';')[0])
 agtools_dir = '{}/agtools'.format(maya_script_dir)
@@ -26,12 +32,104 @@ image_dir = '{}/images'.format(agtools_dir)
 settings_dir = '{}/settings'.format(agtools_dir)
 
 
-image_dir = os.path.abspath(r'T:\gz\AGTools_RP_Editions\images')
+network_image_dir = os.path.abspath(r'T:\gz\AGTools_RP_Editions\images')
 
 AGT_UI_SETTINGS = QtCore.QSettings('MyCompany', 'MyApp')
-BANNER_IMG = os.path.join(image_dir, 'header_img_{}.png')
+BANNER_IMG = 'header_img_{}.png'
 
 agt_suffix = '{}/agt_suffix.json'.format(settings_dir)
+agt_color_space_rules = '{}/agt_color_space_rules.json'.format(settings_dir)
+agt_color_spaces = '{}/agt_color_spaces.json'.format(settings_dir)
+
+class ColorSpaceCache(object):
+    '''
+    input color spaces of the color management config, kept per config path
+    with the config mtime and saved to cache_file so the next session skips
+    the query. nothing is read at import, every lookup checks the config
+    path and mtime and queries maya again only when they changed
+    '''
+    
+    def __init__(self, cache_file=agt_color_spaces):
+        self.cache_file = cache_file
+        self.configs = None
+        self.config = None
+        self.filtered = []
+        
+    def current_config(self):
+        '''
+        (config path, mtime), the maya version stands in for the path when
+        the built in config is used
+        '''
+        if mc.colorManagementPrefs(q=True, cmConfigFileEnabled=True):
+            path = mc.colorManagementPrefs(q=True, configFilePath=True) or ''
+        else:
+            path = 'maya {}'.format(mc.about(version=True))
+        try:
+            mtime = os.path.getmtime(os.path.expandvars(path))
+        except OSError:
+            mtime = 0
+        return path, mtime
+        
+    def load(self):
+        self.configs = {}
+        if os.path.isfile(self.cache_file):
+            try:
+                with open(self.cache_file, 'r') as f:
+                    self.configs = json.load(f)
+            except ValueError:
+                pass
+                
+    def save(self):
+        try:
+            if not os.path.isdir(os.path.dirname(self.cache_file)):
+                os.makedirs(os.path.dirname(self.cache_file))
+            with open(self.cache_file, 'w') as f:
+                json.dump(self.configs, f, indent=4)
+        except (IOError, OSError):
+            om.MGlobal.displayWarning('could not save color spaces to {}'.format(self.cache_file))
+            
+    def input_spaces(self, path, mtime):
+        cached = self.configs.get(path)
+        if cached and cached['mtime'] == mtime:
+            return cached['input_spaces']
+        input_spaces = mc.colorManagementPrefs(q=True, inputSpaceNames=True) or []
+        self.configs[path] = {'mtime': mtime, 'input_spaces': input_spaces}
+        self.save()
+        return input_spaces
+        
+    def get_filtered(self):
+        '''
+        input color spaces matching available_color_spaces, the same list
+        object until the config changes
+        '''
+        if self.configs is None:
+            self.load()
+        config = self.current_config()
+        if config != self.config:
+            self.filtered = [space for space in self.input_spaces(*config) if available_color_spaces.search(space)]
+            self.config = config
+        return self.filtered
+        
+# filled on first use, nothing is queried or loaded at import
+COLOR_SPACES = ColorSpaceCache()
+IMAGE_CACHE = {}
+
+
+def get_filtered_color_spaces():
+    return COLOR_SPACES.get_filtered()
+
+def get_image(file_name):
+    '''
+    QImage from the local image dir, falling back to the network share,
+    loaded once per file
+    '''
+    if file_name not in IMAGE_CACHE:
+        image = QtGui.QImage()
+        for directory in [image_dir, network_image_dir]:
+            if image.load(os.path.join(directory, file_name)):
+                break
+        IMAGE_CACHE[file_name] = image
+    return IMAGE_CACHE[file_name]
 
 
 class CustomColorButton(QtWidgets.QWidget):
@@ -114,21 +212,55 @@ class textBox(QtWidgets.QLineEdit):
         elif e.key() == QtCore.Qt.Key_Return:
             self.enter_pressed.emit("Return Key Pressed")
 
+class LazyComboBox(QtWidgets.QComboBox):
+    '''
+    combo box that asks items_func for its items each time it opens and
+    only rebuilds when they changed, nothing is asked before the first open
+    '''
+    
+    def __init__(self, items_func, parent=None):
+        super(LazyComboBox, self).__init__(parent)
+        self.items_func = items_func
+        self.items = None
+        
+    def populate(self):
+        items = self.items_func()
+        if items is self.items:
+            return
+        current = self.currentText()
+        self.clear()
+        self.addItems(items)
+        self.items = items
+        if current in items:
+            self.setCurrentText(current)
+            
+    def showPopup(self):
+        self.populate()
+        super(LazyComboBox, self).showPopup()
+        
+
 class CustomImageWidget(QtWidgets.QWidget):
     
-    def __init__(self, width, height, image_path, parent=None):
+    def __init__(self, width, height, image_name, parent=None):
         super(CustomImageWidget, self).__init__(parent)
         self.set_size(width, height)
-        self.set_image(image_path)
+        self.set_image(image_name)
         self.set_backgorund_color(QtCore.Qt.black)
     
     def set_size(self, width, height):
         
         self.setFixedSize(width, height)
         
-    def set_image(self, image_path):
+    def set_image(self, image_name):
+        
+        # the image is only loaded once the widget is actually painted
+        self.image_name = image_name
+        self.pixmap = None
+        self.update()
+        
+    def load_pixmap(self):
         
-        image = QtGui.QImage(image_path)
+        image = get_image(self.image_name)
         image = image.scaled(self.width(), self.height(), QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
         self.pixmap = QtGui.QPixmap()
         self.pixmap.convertFromImage(image)
@@ -141,6 +273,8 @@ class CustomImageWidget(QtWidgets.QWidget):
     def paintEvent(self, event):
         painter = QtGui.QPainter(self)
         painter.fillRect(0, 0, self.width(), self.height(), self.background_color)
+        if self.pixmap is None:
+            self.load_pixmap()
         painter.drawPixmap(self.rect(), self.pixmap)
         
 
@@ -207,6 +341,334 @@ class MyLineEdit(QtWidgets.QLineEdit):
         if e.key() == QtCore.Qt.Key_Enter or e.key() == QtCore.Qt.Key_Return:
             self.enter_pressed.emit()
 
+class NameFormatter(object):
+    '''
+    rename settings compiled once per preview: invalid characters go through a
+    single translate table and the prefix/name/separator/suffix are pre-joined,
+    so naming a node is at most one translate and one concatenation
+    
+    a template like '{prefix}_{name}_{index:03d}_{suffix}' replaces the default
+    prefix_name_index_suffix layout, it can use prefix, name, index, suffix
+    and separator
+    '''
+    
+    INVALID_CHARACTERS = ' !@#$%^&*()-=+[];:\'\"<>?{}\\/,|~.*'
+    TRANSLATE_TABLE = str.maketrans(INVALID_CHARACTERS, '_' * len(INVALID_CHARACTERS))
+    REPEATED_UNDERSCORE = re.compile(r'__+')
+    
+    def __init__(self, rename_setting_dict):
+        translate_table = self.TRANSLATE_TABLE
+        self.new_name = rename_setting_dict['new_name']
+        self.padding_length = rename_setting_dict['padding_length']
+        self.separator = rename_setting_dict['separator'].translate(translate_table)
+        self.prefix = rename_setting_dict['prefix'].translate(translate_table)
+        self.suffix = rename_setting_dict['suffix'].translate(translate_table)
+        self.template = rename_setting_dict.get('template', '')
+        
+        # everything except the old name and the index is known up front
+        self.head = self.prefix + self.separator if self.prefix else ''
+        self.tail = self.separator + self.suffix if self.suffix else ''
+        self.named_head = self.head + self.new_name.translate(translate_table) + self.separator
+        self.named_plain = self.head + self.new_name.translate(translate_table) + self.tail
+        
+        if self.template:
+            # fail here rather than on every node, any error a user typed
+            # template can raise ({name.x}, {index:s}, {0}, ...) becomes ValueError
+            try:
+                self.template.format(prefix='', name='', index=1, suffix='', separator='')
+            except Exception as e:
+                raise ValueError('invalid template {!r}: {}'.format(self.template, e))
+            
+    def format(self, old_name, idx):
+        if self.template:
+            new_name = self.template.format(
+                prefix=self.prefix, name=self.new_name or old_name, index=idx,
+                suffix=self.suffix, separator=self.separator)
+            new_name = new_name.translate(self.TRANSLATE_TABLE)
+            return self.REPEATED_UNDERSCORE.sub('_', new_name).strip('_')
+        if not self.new_name:
+            return self.head + old_name.translate(self.TRANSLATE_TABLE) + self.tail
+        if self.padding_length and self.new_name != old_name:
+            return self.named_head + str(idx).zfill(self.padding_length) + self.tail
+        return self.named_plain
+        
+    def format_all(self, old_names, indices):
+        return [self.format(old_name, idx) for old_name, idx in zip(old_names, indices)]
+        
+
+def benchmark_name_formatter(count=100000):
+    '''
+    per-name cost of NameFormatter against the previous replace loop
+    '''
+    def legacy_get_new_name(old_name, idx, rename_setting_dict):
+        invalid_characters = ' !@#$%^&*()-=+[];:\'\"<>?{}\\/,|~.*'
+        zeros_padding = ''
+        padding_length = rename_setting_dict['padding_length']
+        separator = rename_setting_dict['separator']
+        prefix = rename_setting_dict['prefix']
+        new_name = rename_setting_dict['new_name'] or old_name
+        suffix = rename_setting_dict['suffix']
+        if padding_length and new_name != old_name:
+            zeros_padding = str(idx).zfill(padding_length)
+        new_name_full = [prefix, new_name, zeros_padding, suffix]
+        new_name_full = separator.join(filter(None, new_name_full))
+        for char in invalid_characters:
+            new_name_full = new_name_full.replace(char, '_')
+        return new_name_full
+    
+    rename_setting_dict = {
+        'new_name' : 'body',
+        'padding_length' : 3,
+        'prefix' : 'l',
+        'suffix' : 'geo',
+        'separator' : '_',
+    }
+    old_names = ['pCube{}'.format(idx) for idx in range(count)]
+    indices = list(range(1, count + 1))
+    
+    start_time = time.time()
+    legacy_names = [legacy_get_new_name(name, idx, rename_setting_dict) for name, idx in zip(old_names, indices)]
+    legacy_time = time.time() - start_time
+    
+    start_time = time.time()
+    new_names = NameFormatter(rename_setting_dict).format_all(old_names, indices)
+    formatter_time = time.time() - start_time
+    
+    assert legacy_names == new_names
+    print('{} names  legacy {:.3f}us/name  formatter {:.3f}us/name'.format(
+        count, legacy_time / count * 1e6, formatter_time / count * 1e6))
+    return legacy_time / count, formatter_time / count
+
+
+class RenamePreviewModel(QtCore.QAbstractTableModel):
+    '''
+    old name / new name / status preview over SelectionColumns, new names and
+    statuses are computed per row on demand so only the rows the view shows
+    are ever formatted. sibling collisions need every new name, find_collisions
+    looks for them in one pass once per refresh (not per row) and again right
+    before the rename is applied
+    '''
+    
+    HEADERS = ['Name', 'New Name', 'Status']
+    VALID_NAME = re.compile(r'^(?:[A-Za-z_][A-Za-z0-9_]*:)*[A-Za-z_][A-Za-z0-9_]*$')
+    STATUS_COLORS = {'duplicate': '#fdca3b', 'invalid': '#fd3b70'}
+    
+    def __init__(self, parent=None):
+        super(RenamePreviewModel, self).__init__(parent)
+        self.items = SelectionColumns([], [], [], [], [])
+        self.settings = {}
+        self.formatter = None
+        self.suffixes = None
+        self.suffix_formatters = {}
+        self.new_names = {}
+        self.duplicates = set()
+        
+    def set_items(self, items):
+        self.beginResetModel()
+        self.items = items
+        self.new_names = {}
+        self.duplicates = set()
+        self.endResetModel()
+        
+    def clear(self):
+        self.set_items(SelectionColumns([], [], [], [], []))
+        
+    def set_settings(self, settings, suffixes=None):
+        '''
+        suffixes : optional per-row suffix list (auto suffix), overrides the suffix setting
+        '''
+        self.formatter = NameFormatter(settings)
+        self.settings = settings
+        self.suffixes = suffixes
+        self.suffix_formatters = {}
+        self.new_names = {}
+        self.duplicates = set()
+        if self.items.uids:
+            self.dataChanged.emit(self.index(0, 1), self.index(len(self.items.uids) - 1, 2))
+            
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.items.uids)
+        
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+        
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+        
+    def new_name(self, row):
+        if row not in self.new_names:
+            formatter = self.formatter
+            if self.suffixes:
+                suffix = self.suffixes[row]
+                # only a handful of distinct suffixes, one compiled formatter each
+                if suffix not in self.suffix_formatters:
+                    self.suffix_formatters[suffix] = NameFormatter(dict(self.settings, suffix=suffix))
+                formatter = self.suffix_formatters[suffix]
+            self.new_names[row] = formatter.format(self.items.names[row], self.items.indices[row])
+        return self.new_names[row]
+        
+    def status(self, row):
+        new_name = self.new_name(row)
+        if not self.VALID_NAME.match(new_name):
+            return 'invalid'
+        if row in self.duplicates:
+            return 'duplicate'
+        if new_name == self.items.names[row]:
+            return 'unchanged'
+        return 'ok'
+        
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        column = index.column()
+        if role == QtCore.Qt.DisplayRole:
+            if column == 0:
+                return self.items.names[row]
+            elif column == 1:
+                return self.new_name(row)
+            return self.status(row)
+        elif role == QtCore.Qt.ForegroundRole and column > 0:
+            color = self.STATUS_COLORS.get(self.status(row))
+            if color:
+                return QtGui.QBrush(QtGui.QColor(color))
+        return None
+        
+    def find_collisions(self):
+        '''
+        flag rows whose new name is shared with a sibling (same parent), the
+        same name under different parents is fine in maya. returns the rows
+        '''
+        rows_by_name = {}
+        for row, parent in enumerate(self.items.parents):
+            rows_by_name.setdefault((parent, self.new_name(row)), []).append(row)
+        self.duplicates = set(row for rows in rows_by_name.values() if len(rows) > 1 for row in rows)
+        if self.items.uids:
+            self.dataChanged.emit(self.index(0, 2), self.index(len(self.items.uids) - 1, 2))
+        return sorted(self.duplicates)
+        
+    def resolve_all(self):
+        '''
+        fill new_name of every item, used before applying the rename
+        '''
+        self.items.new_names[:] = [self.new_name(row) for row in range(len(self.items.uids))]
+        return self.items
+        
+
+# (name, table header, component type) of every mesh health check
+MESH_HEALTH_CHECKS = [
+    ('Triangles', 'Tris', 'f'),
+    ('Quads', 'Quads', 'f'),
+    ('N-Gons', 'N-Gons', 'f'),
+    ('Concave', 'Concave', 'f'),
+    ('Non-Manifold Edges', 'NM Edges', 'e'),
+    ('Non-Manifold Vertices', 'NM Verts', 'vtx'),
+    ('Lamina', 'Lamina', 'f'),
+    ('Zero Area', 'Zero Area', 'f'),
+]
+MESH_HEALTH_ISSUES = [name for name, header, kind in MESH_HEALTH_CHECKS if name != 'Quads']
+
+MeshHealthReport = namedtuple('MeshHealthReport', ['mesh', 'issues'])
+
+class MeshHealthModel(QtCore.QAbstractTableModel):
+    '''
+    one row per scanned mesh with the number of components each check found,
+    rows can be narrowed down to the meshes failing a single check
+    '''
+    
+    HEADERS = ['Mesh'] + [header for name, header, kind in MESH_HEALTH_CHECKS]
+    ISSUE_COLOR = '#fd3b70'
+    
+    def __init__(self, parent=None):
+        super(MeshHealthModel, self).__init__(parent)
+        self.reports = []
+        self.rows = []
+        self.check = None
+        
+    def set_reports(self, reports):
+        self.beginResetModel()
+        self.reports = reports
+        self.update_rows()
+        self.endResetModel()
+        
+    def set_filter(self, check=None):
+        '''
+        check : a MESH_HEALTH_CHECKS name, None keeps every mesh with any issue
+        '''
+        self.beginResetModel()
+        self.check = check
+        self.update_rows()
+        self.endResetModel()
+        
+    def add_report(self, report):
+        self.reports.append(report)
+        if self.accepts(report):
+            row = len(self.rows)
+            self.beginInsertRows(QtCore.QModelIndex(), row, row)
+            self.rows.append(report)
+            self.endInsertRows()
+            
+    def accepts(self, report):
+        checks = [self.check] if self.check else MESH_HEALTH_ISSUES
+        return any(len(report.issues[check]) for check in checks)
+        
+    def update_rows(self):
+        self.rows = [report for report in self.reports if self.accepts(report)]
+        
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+        
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.HEADERS)
+        
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if orientation == QtCore.Qt.Horizontal:
+            if role == QtCore.Qt.DisplayRole:
+                return self.HEADERS[section]
+            if role == QtCore.Qt.ToolTipRole and section:
+                return MESH_HEALTH_CHECKS[section - 1][0]
+        return None
+        
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        report = self.rows[index.row()]
+        column = index.column()
+        if role == QtCore.Qt.DisplayRole:
+            if column == 0:
+                return report.mesh.rsplit('|', 1)[-1]
+            return len(report.issues[MESH_HEALTH_CHECKS[column - 1][0]])
+        elif role == QtCore.Qt.ToolTipRole and column == 0:
+            return report.mesh
+        elif role == QtCore.Qt.ForegroundRole and column > 0:
+            check = MESH_HEALTH_CHECKS[column - 1][0]
+            if check in MESH_HEALTH_ISSUES and len(report.issues[check]):
+                return QtGui.QBrush(QtGui.QColor(self.ISSUE_COLOR))
+        return None
+        
+    def components(self, index):
+        '''
+        ComponentSets behind a cell, the mesh column gives every issue of the
+        row, or only the filtered check
+        '''
+        report = self.rows[index.row()]
+        if index.column() == 0:
+            checks = [self.check] if self.check else MESH_HEALTH_ISSUES
+        else:
+            checks = [MESH_HEALTH_CHECKS[index.column() - 1][0]]
+        return [report.issues[check] for check in checks]
+        
+
 class CustomRoundCornerButton(QtWidgets.QPushButton):
     def __init__(self, text):
         super(CustomRoundCornerButton, self).__init__(text)
@@ -217,6 +679,282 @@ class CustomRoundCornerButton(QtWidgets.QPushButton):
             '''
             )
 
+SelectionColumns = namedtuple('SelectionColumns', ['uids', 'names', 'indices', 'new_names', 'parents'])
+
+READ_ONLY_NODES = set(['|top', '|front', '|persp', '|side'])
+
+def resolve_selection(selection_type='selected'):
+    '''
+    long names of one mode in a single ls/listRelatives query, uids in one more,
+    returned as parallel uid / short name / index / new name / parent columns
+    '''
+    if selection_type == 'hierarchy':
+        long_names = mc.ls(dagObjects=True, shapes=False, sl=True, tr=True, l=True) or []
+    elif selection_type == 'selected':
+        long_names = mc.ls(sl=True, tr=True, l=True) or []
+    elif selection_type == 'all':
+        long_names = mc.ls('*', tr=True, l=True) or []
+    elif selection_type == 'group':
+        # children that are parents themselves, found through their own children
+        children = mc.listRelatives(mc.ls(sl=True, tr=True, l=True), c=True, f=True) or []
+        grandchildren = mc.listRelatives(children, c=True, f=True) or []
+        groups = set(mc.listRelatives(grandchildren, p=True, f=True) or [])
+        long_names = [child for child in children if child in groups]
+    else:
+        raise ValueError('Invalid selection type: {}'.format(selection_type))
+    
+    long_names = [node for node in long_names if node not in READ_ONLY_NODES]
+    uids = mc.ls(long_names, uid=True) if long_names else []
+    names = [node.rsplit('|', 1)[-1] for node in long_names]
+    parents = [node.rsplit('|', 1)[0] for node in long_names]
+    return SelectionColumns(uids, names, list(range(1, len(uids) + 1)), [''] * len(uids), parents)
+
+def benchmark_selection(node_counts=(1000, 10000, 100000), repeat=3):
+    '''
+    compare resolve_selection with the previous per-node implementation on
+    synthetic hierarchies (groups of ten transforms), prints and returns timings
+    '''
+    def legacy_selection(selection_type):
+        READ_ONLY = mc.ls(['|top', '|front', '|persp', '|side'], uid=True)
+        selection = []
+        if selection_type == 'hierarchy':
+            selection = mc.ls(mc.ls(dagObjects=True, shapes=False, sl=True, tr=True), uid=True)
+        elif selection_type == 'selected':
+            selection = mc.ls(sl=True, tr=True, uid=True)
+        elif selection_type == 'group':
+            selection = mc.ls(
+                [i for obj in mc.ls(sl=True, tr=True, uid=True) 
+                for i in mc.listRelatives(mc.ls(obj, l=True), c=True, f=True) 
+                if mc.listRelatives(i, c=True, f=True)], 
+                uid=True
+                )
+        selection_uid = [node for node in selection if node not in READ_ONLY]
+        return [
+                {
+                    'uid':node, 
+                    'name':mc.ls(node)[0].split('|')[-1],
+                    'index':idx+1,
+                    'new_name':''
+                }
+                for idx, node in enumerate(selection_uid)
+            ]
+    
+    results = []
+    current_selection = mc.ls(sl=True, l=True)
+    for node_count in node_counts:
+        dag_modifier = om.MDagModifier()
+        root = dag_modifier.createNode('transform')
+        dag_modifier.renameNode(root, 'agt_benchmark_grp')
+        for grp_idx in range(max(node_count // 10, 1)):
+            grp = dag_modifier.createNode('transform', root)
+            for child_idx in range(9):
+                dag_modifier.createNode('transform', grp)
+        dag_modifier.doIt()
+        root_name = om.MFnDagNode(root).fullPathName()
+        
+        try:
+            for selection_type in ['selected', 'hierarchy', 'group']:
+                if selection_type == 'selected':
+                    mc.select(root_name, hi=True)
+                else:
+                    mc.select(root_name)
+                timings = {}
+                for label, func in [('legacy', legacy_selection), ('batched', resolve_selection)]:
+                    best = None
+                    for run in range(repeat):
+                        start_time = time.time()
+                        func(selection_type)
+                        elapsed = time.time() - start_time
+                        best = elapsed if best is None else min(best, elapsed)
+                    timings[label] = best
+                results.append((node_count, selection_type, timings['legacy'], timings['batched']))
+                print('{:>7} nodes  {:<10} legacy {:8.3f}s  batched {:8.3f}s  x{:.1f}'.format(
+                    node_count, selection_type, timings['legacy'], timings['batched'],
+                    timings['legacy'] / max(timings['batched'], 1e-6)))
+        finally:
+            mc.delete(root_name)
+    mc.select(current_selection)
+    return results
+
+def get_rename_items(selection):
+    '''
+    resolve uids to long names with one batched query and snapshot sibling names
+    '''
+    long_names = mc.ls(selection.uids, l=True) or []
+    long_names_by_uid = dict(zip(mc.ls(long_names, uid=True) or [], long_names))
+    
+    rename_items = []
+    for uid, new_name in zip(selection.uids, selection.new_names):
+        long_name = long_names_by_uid.get(uid)
+        if not long_name:
+            continue
+        parent, name = long_name.rsplit('|', 1)
+        rename_items.append({
+            'uid': uid,
+            'long_name': long_name,
+            'parent': parent,
+            'name': name,
+            'new_name': new_name or name,
+        })
+    
+    sibling_names = {}
+    for parent in set(item['parent'] for item in rename_items):
+        if parent:
+            children = mc.listRelatives(parent, c=True, f=True) or []
+        else:
+            children = mc.ls(assemblies=True, l=True) or []
+        sibling_names[parent] = set(child.split('|')[-1] for child in children)
+    
+    return rename_items, sibling_names
+
+def apply_renames(selection):
+    '''
+    plan the whole batch, then run it inside one undo chunk, returns renamed count
+    '''
+    rename_items, sibling_names = get_rename_items(selection)
+    steps = plan_renames(rename_items, sibling_names)
+    if not steps:
+        return 0
+    
+    # dag paths keep pointing at the right node while parents get renamed
+    sel_list = om.MSelectionList()
+    for item in rename_items:
+        sel_list.add(item['long_name'])
+    dag_paths = {item['uid']: sel_list.getDagPath(idx) for idx, item in enumerate(rename_items)}
+    
+    start_time = time.time()
+    mc.undoInfo(openChunk=True)
+    try:
+        for uid, name in steps:
+            mc.rename(dag_paths[uid].fullPathName(), name)
+    finally:
+        mc.undoInfo(closeChunk=True)
+    elapsed = time.time() - start_time
+    
+    renamed_count = len(set(uid for uid, name in steps))
+    om.MGlobal.displayInfo('renamed {} objects in {:.3f}s ({:.0f} objects/s)'.format(
+        renamed_count, elapsed, renamed_count / max(elapsed, 1e-6)))
+    return renamed_count
+
+class EventCallback(object):
+    '''
+    OpenMaya event callback that is only registered while something consumes
+    it, all events arriving before the next idle tick are delivered as one call
+    '''
+    
+    def __init__(self, event_name, func):
+        self.event_name = event_name
+        self.func = func
+        self.callback_id = None
+        self.pending = False
+        
+    def is_registered(self):
+        return self.callback_id is not None
+        
+    def register(self):
+        if self.callback_id is None:
+            self.callback_id = om.MEventMessage.addEventCallback(self.event_name, self.on_event)
+            
+    def remove(self):
+        if self.callback_id is not None:
+            om.MMessage.removeCallback(self.callback_id)
+            self.callback_id = None
+        self.pending = False
+        
+    def on_event(self, *args):
+        if not self.pending:
+            self.pending = True
+            maya.utils.executeDeferred(self.flush)
+            
+    def flush(self):
+        # the callback may have been removed before maya went idle
+        if self.pending and self.callback_id is not None:
+            self.pending = False
+            self.func()
+            
+
+class AutoSuffixService(object):
+    '''
+    classifies nodes by type in bulk and maps them to a suffix, results are
+    memoized per uid and dropped when the dag changes under a node
+    '''
+    
+    DEFAULT_SUFFIXES = {
+        'mesh': 'geo',
+        'transform': 'grp',
+        'joint': 'jnt',
+        'locator': 'loc',
+        'nurbsCurve': 'ctr',
+        'lambert': 'mtl',
+        'blinn': 'mtl',
+        'phong': 'mtl',
+        'surfaceShader': 'mtl',
+        'standardSurface': 'mtl',
+        'aiStandardSurface': 'mtl',
+        'shadingEngine': 'sg',
+    }
+    
+    def __init__(self, suffix_file=agt_suffix):
+        self.suffix_map = self.load_suffix_map(suffix_file)
+        self.cache = {}
+        self.callback_ids = []
+        
+    @classmethod
+    def load_suffix_map(cls, suffix_file):
+        suffix_map = dict(cls.DEFAULT_SUFFIXES)
+        if os.path.isfile(suffix_file):
+            with open(suffix_file, 'r') as f:
+                suffix_map.update(json.load(f))
+        return suffix_map
+        
+    def register_callbacks(self):
+        if self.callback_ids:
+            return
+        self.callback_ids.append(om.MDagMessage.addAllDagChangesCallback(self.on_dag_changed))
+        for message in [om.MSceneMessage.kAfterNew, om.MSceneMessage.kAfterOpen]:
+            self.callback_ids.append(om.MSceneMessage.addCallback(message, self.clear))
+            
+    def remove_callbacks(self):
+        for callback_id in self.callback_ids:
+            om.MMessage.removeCallback(callback_id)
+        self.callback_ids = []
+        
+    def on_dag_changed(self, message, child, parent, client_data=None):
+        # a shape was added, removed or reparented, the parent may change type
+        for dag_path in [child, parent]:
+            try:
+                uid = om.MFnDependencyNode(dag_path.node()).uuid().asString()
+            except RuntimeError:
+                continue
+            self.cache.pop(uid, None)
+            
+    def clear(self, *args):
+        self.cache = {}
+        
+    def node_types(self, long_names):
+        '''
+        true type of each transform (the type of its first shape, or its own
+        type when it has none) with three batched queries
+        '''
+        own_types = (mc.ls(long_names, showType=True) or [])[1::2]
+        shapes = mc.listRelatives(long_names, s=True, f=True, ni=True) or []
+        shape_types = (mc.ls(shapes, showType=True) or [])[1::2]
+        
+        first_shape_types = {}
+        for shape, shape_type in zip(shapes, shape_types):
+            first_shape_types.setdefault(shape.rsplit('|', 1)[0], shape_type)
+        return [first_shape_types.get(node, node_type) for node, node_type in zip(long_names, own_types)]
+        
+    def suffixes(self, uids):
+        uncached = [uid for uid in set(uids) if uid not in self.cache]
+        if uncached:
+            long_names = mc.ls(uncached, l=True) or []
+            long_uids = mc.ls(long_names, uid=True) or []
+            for uid, node_type in zip(long_uids, self.node_types(long_names)):
+                self.cache[uid] = self.suffix_map.get(node_type, '')
+        return [self.cache.get(uid, '') for uid in uids]
+        
+
 class AGTools(QtWidgets.QWidget):
         
     WINDOW_TITLE = 'AGTools RP Editions'
@@ -254,17 +992,13 @@ class AGTools(QtWidgets.QWidget):
         self.setAttribute(QtCore.Qt.WA_DeleteOnClose, True)
         self.installEventFilter(self)
         
+        self.selection_callback = None
         self.create_widgets()
         self.create_layout()
         self.create_connections()
         self.create_workspace_control()
         
-        self.renderer_node_switch()
-        self.job_update_selection = mc.scriptJob(event=['SelectionChanged', 'agt_ui.rename_refresh_items()'], parent=self.__class__.UI_NAME)
-        self.rename_refresh_items()
         self.set_user_data()
-        print('job_num')
-        print(self.job_update_selection)
         
     def create_widgets(self):
         
@@ -296,10 +1030,17 @@ class AGTools(QtWidgets.QWidget):
         
         self.title_label.setHidden(AGT_UI_SETTINGS.value('hide_banner', True, type=bool))
         
-        self.header_img = QtGui.QPixmap('{}\\header_img_agao.png'.format(image_dir))
-        self.header_label = QtWidgets.QLabel()
-        self.header_label.setPixmap(self.header_img)
-        self.header_label.setScaledContents(True)
+        # T A B S
+        # empty placeholders, the content of a tab is built by build_tab
+        self.tab_model = QtWidgets.QWidget()
+        self.tab_shader = QtWidgets.QWidget()
+        self.tab_export = QtWidgets.QWidget()
+        self.tab_rename = QtWidgets.QWidget()
+        
+        self.my_tab = QtWidgets.QTabWidget(self)
+        self.built_tabs = set()
+        
+    def create_model_widgets(self):
         
         self.model_line_01 = QtWidgets.QLabel()
         self.model_line_01.setFrameStyle(QtWidgets.QFrame.HLine | QtWidgets.QFrame.Plain)
@@ -317,12 +1058,6 @@ class AGTools(QtWidgets.QWidget):
         self.model_vline_02.setFrameStyle(QtWidgets.QFrame.VLine | QtWidgets.QFrame.Plain)
         self.model_vline_02.setLineWidth(1)
         
-        # T A B S
-        self.tab_model = QtWidgets.QWidget()
-        self.tab_shader = QtWidgets.QWidget()
-        self.tab_export = QtWidgets.QWidget()
-        self.tab_rename = QtWidgets.QWidget()
-        
         model_btn_size_01 = QtCore.QSize(64, 64)
         
         
@@ -355,10 +1090,10 @@ class AGTools(QtWidgets.QWidget):
         del flip_mirror_menu_dict['Radial']
         
         quick_model_btn_dict = {
-            'inst' : {'btn':self.inst_btn, 'icon':'polyShareInstancesSelect', 'func':'print("{}")', 'menu':inst_dupl_menu_dict}, 
-            'dupl' : {'btn':self.duplicate_btn, 'icon':'polyShareInstancesLarge', 'func':'print("{}")', 'menu':inst_dupl_menu_dict}, 
-            'mirr' : {'btn':self.mirror_btn, 'icon':'polyMirrorGeometry', 'func':'print("{}")', 'menu':flip_mirror_menu_dict}, 
-            'flip' : {'btn':self.flip_btn, 'icon':'polyFlip', 'func':'print("{}")', 'menu':flip_mirror_menu_dict}
+            'inst' : {'btn':self.inst_btn, 'icon':'polyShareInstancesSelect', 'menu':inst_dupl_menu_dict}, 
+            'dupl' : {'btn':self.duplicate_btn, 'icon':'polyShareInstancesLarge', 'menu':inst_dupl_menu_dict}, 
+            'mirr' : {'btn':self.mirror_btn, 'icon':'polyMirrorGeometry', 'menu':flip_mirror_menu_dict}, 
+            'flip' : {'btn':self.flip_btn, 'icon':'polyFlip', 'menu':flip_mirror_menu_dict}
             }            
             
         for btn in quick_model_btn_dict:
@@ -367,16 +1102,22 @@ class AGTools(QtWidgets.QWidget):
             btn_info['btn'].setObjectName('{}_btn'.format(btn))
             mc.popupMenu(mm=True, p=btn_info['btn'].objectName())
             for axis in btn_info['menu']:
-                mc.menuItem(l=axis, rp=btn_info['menu'][axis], c=btn_info['func'].format(btn+axis), i=btn_info['icon'])
+                mc.menuItem(l=axis, rp=btn_info['menu'][axis], c=partial(self.quick_model_action, btn, axis), i=btn_info['icon'])
             
         #self.inst_btn.setStyleSheet()
         
-        self.my_tab = QtWidgets.QTabWidget(self)
-        
         # M O D E L   W I D G E T S
         self.object_rb = QtWidgets.QRadioButton('Object')
         self.world_rb = QtWidgets.QRadioButton('World')
         self.object_rb.setChecked(True)
+        self.radial_count_sb = QtWidgets.QSpinBox()
+        self.radial_count_sb.setRange(2, 360)
+        self.radial_count_sb.setValue(6)
+        self.radial_count_sb.setPrefix('Radial ')
+        self.radial_axis_cb = QtWidgets.QComboBox()
+        self.radial_axis_cb.addItems(['X', 'Y', 'Z'])
+        self.radial_axis_cb.setCurrentIndex(1)
+        self.radial_axis_cb.setToolTip('Axis the radial copies turn around')
         
         self.inst_colorize_ckb = QtWidgets.QCheckBox('Colorize Instances')
         self.inst_colorize_ckb.setChecked(True)
@@ -391,6 +1132,32 @@ class AGTools(QtWidgets.QWidget):
         self.badmesh_btn = CustomRoundCornerButton('Select Bad Mesh')
         self.badmesh_btn.setIcon(QtGui.QIcon(':polyTriangulate.png'))
         
+        self.model_line_03 = QtWidgets.QLabel()
+        self.model_line_03.setFrameStyle(QtWidgets.QFrame.HLine | QtWidgets.QFrame.Plain)
+        self.model_line_03.setLineWidth(1)
+        
+        self.health_scan_btn = CustomRoundCornerButton('Scan Meshes')
+        self.health_scan_btn.setIcon(QtGui.QIcon(':polyCleanup.png'))
+        self.health_filter_cb = QtWidgets.QComboBox()
+        self.health_filter_cb.addItems(['All Issues'] + [name for name, header, kind in MESH_HEALTH_CHECKS])
+        self.health_progress = QtWidgets.QProgressBar()
+        self.health_progress.setMaximumHeight(12)
+        self.health_progress.setTextVisible(False)
+        self.health_progress.hide()
+        self.health_job = None
+        
+        self.health_model = MeshHealthModel()
+        self.health_view = QtWidgets.QTableView()
+        self.health_view.setModel(self.health_model)
+        self.health_view.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.health_view.setShowGrid(False)
+        self.health_view.setWordWrap(False)
+        self.health_view.verticalHeader().hide()
+        self.health_view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.health_view.verticalHeader().setDefaultSectionSize(20)
+        self.health_view.horizontalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeToContents)
+        self.health_view.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        
         self.hardedges_label_main = QtWidgets.QLabel('Hard Edges')
         
         self.hardeges_ckb_min = QtWidgets.QCheckBox()
@@ -411,6 +1178,9 @@ class AGTools(QtWidgets.QWidget):
         self.hardedges_slider_max.setDisabled(True)
         self.hardedges_label_max = QtWidgets.QLabel('360')
         
+        self.hardedges_preview_ckb = QtWidgets.QCheckBox('Live Preview')
+        self.hard_edge_preview = HardEdgePreview()
+        
         self.hardedges_select_btn = CustomRoundCornerButton('Select Edges')
         self.hardedges_select_btn.setIcon(QtGui.QIcon(':componentTag_edge.png'))
         self.hardedges_select_btn.setObjectName('hardedges_select_btn')
@@ -459,6 +1229,8 @@ class AGTools(QtWidgets.QWidget):
         self.badmesh_btn.setMenu(self.badmesh_menu)
         
         
+    def create_shader_widgets(self):
+        
         # S H A D E R   W I D G E T S
         self.shader_line_01 = QtWidgets.QLabel()
         self.shader_line_01.setFrameStyle(QtWidgets.QFrame.HLine | QtWidgets.QFrame.Plain)
@@ -493,9 +1265,9 @@ class AGTools(QtWidgets.QWidget):
         self.create_shader_renderer_cb.addItems(['Maya Defualt', 'Arnold', 'V-Ray', 'Redshift'])
         self.create_shader_renderer_cb.setCurrentIndex(1)
         
-        self.create_shader_colorspace_cb = QtWidgets.QComboBox()
+        self.create_shader_colorspace_cb = LazyComboBox(get_filtered_color_spaces)
         self.create_shader_colorspace_cb.setMinimumHeight(27)
-        self.create_shader_colorspace_cb.addItems(FILTERED_COLOR_SPACES)
+        self.create_shader_colorspace_cb.setToolTip('Color space of base color and emission textures, data textures stay raw')
         
         self.create_shader_btn = CustomRoundCornerButton('Create Shader')
         self.create_shader_btn.setIcon(QtGui.QIcon(':hypershadeIcon.png'))
@@ -517,12 +1289,6 @@ class AGTools(QtWidgets.QWidget):
         
         self.create_file_btn = CustomRoundCornerButton('Create File')
         
-        self.hardedges_slider_max = QtWidgets.QSlider(QtCore.Qt.Horizontal)
-        self.hardedges_slider_max.setMinimum(0)
-        self.hardedges_slider_max.setMaximum(360)
-        self.hardedges_slider_max.setValue(360)
-        self.hardedges_slider_max.setEnabled(False)
-        
         self.create_file_num_label = QtWidgets.QLabel('File Counts : ')
         
         
@@ -555,11 +1321,9 @@ class AGTools(QtWidgets.QWidget):
         self.create_cc_btn.setIcon(QtGui.QIcon(':out_remapColor.png'))
         
         self.color_space_menu = QtWidgets.QMenu()
-        self.color_space_list = [cs for cs in FILTERED_COLOR_SPACES]
+        self.color_space_menu_items = None
         self.color_space_btn = CustomRoundCornerButton('Color Space')
         self.color_space_btn.setIcon(QtGui.QIcon(':render_colorProfile.png'))
-        
-        self.color_space_action_list = [self.color_space_menu.addAction(obj) for obj in self.color_space_list]
         self.color_space_btn.setMenu(self.color_space_menu)
         
         
@@ -570,6 +1334,8 @@ class AGTools(QtWidgets.QWidget):
         self.link_break_btn = CustomRoundCornerButton('Break Linked')
         self.link_break_btn.setIcon(QtGui.QIcon(':out_place2dTexture.png'))
         
+    def create_rename_widgets(self):
+        
         # R E N A M E   W I D G E T S
         colorize_btn_size = 24
         
@@ -616,6 +1382,11 @@ class AGTools(QtWidgets.QWidget):
         self.rename_separator_le.setMinimumHeight(24)
         self.rename_separator_le.setFixedWidth(32)
         
+        self.rename_template_le = QtWidgets.QLineEdit()
+        self.rename_template_le.setMinimumHeight(24)
+        self.rename_template_le.setPlaceholderText('{prefix}_{name}_{index:03d}_{suffix}')
+        self.rename_template_le.setToolTip('Optional naming template (prefix, name, index, suffix, separator)')
+        
         self.rename_index_cb = QtWidgets.QComboBox()
         self.rename_index_cb.setMinimumHeight(27)
         self.rename_index_cb.addItems(['None', '1', '01', '001', '0001', '00001', '000001'])
@@ -657,11 +1428,27 @@ class AGTools(QtWidgets.QWidget):
         self.rename_item_preview_ckb.setChecked(True)
         self.change_checkbox_color(self.rename_item_preview_ckb, '3b8dfd')
         
-        self.rename_item_list_tree = QtWidgets.QTreeWidget()
-        self.rename_item_list_tree.setHeaderHidden(True)
-        
-        self.rename_item_renamedlist_tree = QtWidgets.QTreeWidget()
-        self.rename_item_renamedlist_tree.setHeaderHidden(True)
+        self.rename_item_model = RenamePreviewModel(self)
+        self.rename_item_view = QtWidgets.QTableView()
+        self.rename_item_view.setModel(self.rename_item_model)
+        self.rename_item_view.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.rename_item_view.setShowGrid(False)
+        self.rename_item_view.setWordWrap(False)
+        self.rename_item_view.verticalHeader().hide()
+        # fixed row heights and column widths keep the view from measuring every row
+        self.rename_item_view.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.rename_item_view.verticalHeader().setDefaultSectionSize(20)
+        self.rename_item_view.horizontalHeader().setSectionResizeMode(0, QtWidgets.QHeaderView.Stretch)
+        self.rename_item_view.horizontalHeader().setSectionResizeMode(1, QtWidgets.QHeaderView.Stretch)
+        self.rename_item_view.horizontalHeader().setSectionResizeMode(2, QtWidgets.QHeaderView.Fixed)
+        self.rename_item_view.horizontalHeader().resizeSection(2, 72)
+        
+        self.rename_refresh_timer = QtCore.QTimer(self)
+        self.rename_refresh_timer.setSingleShot(True)
+        self.rename_refresh_timer.setInterval(150)
+        self.rename_selection_dirty = True
+        self.rename_selection = SelectionColumns([], [], [], [], [])
+        self.auto_suffix = AutoSuffixService()
         
         self.prefix_btn_label = 'Prefix List'
         if self.is_cap_when_create:
@@ -706,6 +1493,8 @@ class AGTools(QtWidgets.QWidget):
                 action = self.suffix_menu.addSeparator()
             self.suffix_actions.append(action)
 
+    def create_export_widgets(self):
+        
         # E X P O R T   W I D G E T S
         
         self.export_create_shader_folder_le = QtWidgets.QLineEdit()
@@ -724,8 +1513,8 @@ class AGTools(QtWidgets.QWidget):
         self.export_abc_btn = CustomRoundCornerButton('Alembic')
         
     def create_title_label(self):
-        image_path = BANNER_IMG.format(AGT_UI_SETTINGS.value('banner_img', 'agao'))
-        self.title_label = CustomImageWidget(400, 80, image_path)
+        image_name = BANNER_IMG.format(AGT_UI_SETTINGS.value('banner_img', 'agao'))
+        self.title_label = CustomImageWidget(400, 80, image_name)
         self.title_label.set_backgorund_color(QtGui.QColor('#fdca3b'))
 
     def create_layout(self):
@@ -735,6 +1524,12 @@ class AGTools(QtWidgets.QWidget):
         main_layout.addWidget(self.title_label)
         main_layout.addWidget(self.my_tab)
         
+        self.my_tab.addTab(self.tab_model, 'Model')
+        self.my_tab.addTab(self.tab_shader, 'Shader')
+        self.my_tab.addTab(self.tab_rename, 'Rename')
+        self.my_tab.addTab(self.tab_export, 'Export')
+        
+    def create_model_layout(self):
         # M O D E L   L A Y O U T
         model_btn_layout_01 = QtWidgets.QHBoxLayout(self)
         model_btn_layout_01.addWidget(self.inst_btn)
@@ -745,6 +1540,8 @@ class AGTools(QtWidgets.QWidget):
         model_axis_rd_btn = QtWidgets.QVBoxLayout(self)
         model_axis_rd_btn.addWidget(self.object_rb)
         model_axis_rd_btn.addWidget(self.world_rb)
+        model_axis_rd_btn.addWidget(self.radial_count_sb)
+        model_axis_rd_btn.addWidget(self.radial_axis_cb)
         
 
         
@@ -769,6 +1566,7 @@ class AGTools(QtWidgets.QWidget):
         model_hardedges_form_layout_main = QtWidgets.QFormLayout()
         model_hardedges_form_layout_main.addRow('Min Angle', model_hardedges_layout_min)
         model_hardedges_form_layout_main.addRow('Max Angle', model_hardedges_layout_max)
+        model_hardedges_form_layout_main.addRow('', self.hardedges_preview_ckb)
         
         model_hardedges_HBoxlayout_01.addLayout(model_hardedges_form_layout_main)
         model_hardedges_HBoxlayout_01.addWidget(self.hardedges_select_btn)
@@ -790,6 +1588,17 @@ class AGTools(QtWidgets.QWidget):
         model_layout.addWidget(self.model_line_02)
         model_layout.addLayout(model_select_layout_01)
         
+        model_health_layout = QtWidgets.QHBoxLayout()
+        model_health_layout.addWidget(self.health_scan_btn)
+        model_health_layout.addWidget(self.health_filter_cb)
+        model_layout.addWidget(self.model_line_03)
+        model_layout.addLayout(model_health_layout)
+        model_layout.addWidget(self.health_progress)
+        model_layout.addWidget(self.health_view)
+        
+        self.tab_model.setLayout(model_layout)
+        
+    def create_shader_layout(self):
         # S H A D E R   L A Y O U T
         shader_layout = QtWidgets.QVBoxLayout(self)
         shader_layout.setAlignment(QtCore.Qt.AlignTop)
@@ -889,6 +1698,9 @@ class AGTools(QtWidgets.QWidget):
         
         shader_layout.addLayout(color_slider_layout)
         shader_layout.addWidget(self.shader_line_03)
+        self.tab_shader.setLayout(shader_layout)
+        
+    def create_rename_layout(self):
         # R E N A M E   L A Y O U T
         rename_layout = QtWidgets.QVBoxLayout()
         rename_layout.setAlignment(QtCore.Qt.AlignTop)
@@ -957,8 +1769,7 @@ class AGTools(QtWidgets.QWidget):
         
         
         rename_item_list_layout = QtWidgets.QHBoxLayout()
-        rename_item_list_layout.addWidget(self.rename_item_list_tree)
-        rename_item_list_layout.addWidget(self.rename_item_renamedlist_tree)
+        rename_item_list_layout.addWidget(self.rename_item_view)
         #rename_btn_layout.addWidget(self.rename_btn)
         
         self.rename_separator_layout = QtWidgets.QHBoxLayout()
@@ -982,6 +1793,7 @@ class AGTools(QtWidgets.QWidget):
         rename_le_form_layout.addRow('Prefix :', prefix_layout)
         #rename_le_form_layout.addRow('Suffix :', suffix_layout)
         rename_le_form_layout.addRow('Name :', rename_le_layout)
+        rename_le_form_layout.addRow('Template :', self.rename_template_le)
         
         #rename_le_form_layout.addRow('Suffix :', suffix_layout)
         rename_layout.addLayout(self.rename_separator_layout)
@@ -997,6 +1809,9 @@ class AGTools(QtWidgets.QWidget):
         #rename_layout.addLayout(rename_btn_layout)
         
         
+        self.tab_rename.setLayout(rename_layout)
+        
+    def create_export_layout(self):
         # E X P O R T    L A Y O U T
         
         
@@ -1048,23 +1863,8 @@ class AGTools(QtWidgets.QWidget):
         export_layout.addLayout(export_tex_layout)
         export_layout.addWidget(self.export_tab_grp)
         export_layout.setAlignment(QtCore.Qt.AlignTop)
-        
-        
-        
-        self.my_tab.addTab(self.tab_model, 'Model')
-        self.tab_model.setLayout(model_layout)
-        #self.tab_model.setStyleSheet("background-color: #3a3a3a")
-        self.my_tab.addTab(self.tab_shader, 'Shader')
-        self.tab_shader.setLayout(shader_layout)
-        self.my_tab.addTab(self.tab_rename, 'Rename')
-        self.tab_rename.setLayout(rename_layout)
-        self.my_tab.addTab(self.tab_export, 'Export')
         self.tab_export.setLayout(export_layout)
         
-        #main_layout.addTab(self.test)
-        
-        
-        
     def create_connections(self):
         
 
@@ -1072,72 +1872,49 @@ class AGTools(QtWidgets.QWidget):
             item.triggered.connect(lambda checked=None, text=item.text().lower(): self.update_banner(text))
         
         self.hide_banner.triggered.connect(lambda: self.banner_display_toggle())
-        #self.inst_btn.
-        #print(self.changedValue(self.hardedges_slider_min, self.hardedges_label_min))
-        self.my_tab.currentChanged.connect(lambda: self.rename_refresh_items())
-        
-        self.rename_colorize_01_btn.clicked.connect(lambda: colorize(0.992, 0.231, 0.439))
-        self.rename_colorize_02_btn.clicked.connect(lambda: colorize(1.0, 0.494, 0.239))
-        self.rename_colorize_03_btn.clicked.connect(lambda: colorize(1.531999945640564, 0.8253204822540283, 0.4320240020751953))
-        self.rename_colorize_04_btn.clicked.connect(lambda: colorize(0.192, 0.824, 0.694))
-        self.rename_colorize_05_btn.clicked.connect(lambda: colorize(0.231, 0.553, 0.992))
-        self.rename_colorize_06_btn.clicked.connect(lambda: colorize(0.894, 0.314, 1.0))
-        self.rename_colorize_reset_btn.clicked.connect(lambda: reset_color())
-        self.rename_caps_ckb.clicked.connect(lambda: self.is_caps())
+        self.my_tab.currentChanged.connect(self.build_tab)
+        self.my_tab.currentChanged.connect(self.indexEvent)
         
-        self.rename_caps_ckb.clicked.connect(lambda: self.rename_refresh_items())
-        self.rename_separator_cb.currentTextChanged.connect(lambda: self.rename_separator_cb_changed())
-        self.rename_separator_le.textChanged.connect(lambda: self.rename_refresh_items())
-        self.rename_selection_cb.currentTextChanged.connect(lambda: self.rename_refresh_items())
-        self.rename_item_preview_ckb.toggled.connect(lambda: self.change_checkbox_color(self.rename_item_preview_ckb, '3b8dfd'))
-        self.rename_item_preview_ckb.toggled.connect(lambda: self.rename_refresh_items())
-        self.rename_le.enter_pressed.connect(lambda: self.rename(True))
-        self.rename_le.enter_pressed.connect(lambda: self.rename_refresh_items())
-        self.rename_le.textChanged.connect(lambda: self.rename_refresh_items())
-        self.rename_prefix_le.enter_pressed.connect(lambda: self.rename(True))
-        self.rename_prefix_le.enter_pressed.connect(lambda: self.rename_refresh_items())
-        self.rename_prefix_le.textChanged.connect(lambda: self.rename_refresh_items())
-        self.rename_suffix_le.enter_pressed.connect(lambda: self.rename(True))
-        self.rename_suffix_le.enter_pressed.connect(lambda: self.rename_refresh_items())
-        self.rename_suffix_le.textChanged.connect(lambda: self.rename_refresh_items())
-        self.rename_index_cb.currentTextChanged.connect(lambda: self.rename_refresh_items())
+    def create_model_connections(self):
         
-        self.create_file_btn.clicked.connect(lambda: self.create_file())
-        self.create_shader_btn.clicked.connect(lambda: self.create_shader())
-        self.link_repeat_btn.clicked.connect(lambda: link_uv())
-        self.link_break_btn.clicked.connect(lambda: break_linked_uv())
-        self.rename_btn.clicked.connect(lambda: self.rename(True))
         self.inst_merge_ckb.toggled.connect(lambda: self.change_checkbox_color(self.inst_merge_ckb, 'fdca3b'))
         self.inst_colorize_ckb.toggled.connect(lambda: self.change_checkbox_color(self.inst_colorize_ckb, 'fdca3b'))
         self.inst_btn.clicked.connect(lambda: instance(colorize=self.inst_colorize_ckb.isChecked()))
-        # self.inst_btn.clicked.connect(lambda: print(self.inst_colorize_ckb.isChecked()))
         self.inst_bake_btn.clicked.connect(lambda: bake_instance())
-
-        #print
-        
-        #self.hardeges_ckb_max.toggled.connect(lambda: self.change_checkbox_color(self.hardeges_ckb_max, 'fdca3b'))
-        #self.hardeges_ckb_min.toggled.connect(lambda: self.change_checkbox_color(self.hardeges_ckb_min, 'fdca3b'))
+        self.axis_radial_btn.clicked.connect(lambda: self.quick_model_action('inst', 'Radial'))
         
         self.hardeges_ckb_min.toggled.connect(lambda: self.enableCheck(self.hardeges_ckb_min, self.hardedges_slider_min))
         self.hardeges_ckb_max.toggled.connect(lambda: self.enableCheck(self.hardeges_ckb_max, self.hardedges_slider_max))
         self.hardedges_slider_min.valueChanged.connect(lambda: self.value_to_label(self.hardedges_slider_min, self.hardedges_label_min))
         self.hardedges_slider_max.valueChanged.connect(lambda: self.value_to_label(self.hardedges_slider_max, self.hardedges_label_max))
-        
-        print(int(self.hardedges_label_min.text()),  int(self.hardedges_label_max.text()))
+        for slider in [self.hardedges_slider_min, self.hardedges_slider_max]:
+            slider.sliderPressed.connect(self.start_hard_edge_preview)
+            slider.valueChanged.connect(self.update_hard_edge_preview)
+            slider.sliderReleased.connect(self.hard_edge_preview.stop)
+        self.hardedges_preview_ckb.toggled.connect(lambda checked: self.hard_edge_preview.stop())
         
         self.hardedges_select_btn.clicked.connect(lambda: select_hard_edges(
             int(self.hardedges_label_min.text()),  int(self.hardedges_label_max.text())
             ))
         
-        
-        for i in self.color_space_list:
-            print(self.color_space_list.index(i))
-        
-        for action in self.color_space_action_list:
-            action.triggered.connect(lambda checked=None, cs=action.text(): set_color_space(cs))
-                
         self.checker_btn.clicked.connect(lambda: checker_select())
+        
+        self.health_scan_btn.clicked.connect(self.scan_mesh_health)
+        self.health_filter_cb.currentIndexChanged.connect(lambda index: self.health_model.set_filter(
+            self.health_filter_cb.currentText() if index else None))
+        self.health_view.clicked.connect(self.select_health_issue)
         self.floor_btn.clicked.connect(lambda: move_to_center())
+        
+    def create_shader_connections(self):
+        
+        self.create_file_btn.clicked.connect(lambda: self.create_file())
+        self.create_shader_btn.clicked.connect(lambda: self.create_shader())
+        self.link_repeat_btn.clicked.connect(lambda: link_uv())
+        self.link_break_btn.clicked.connect(lambda: break_linked_uv())
+        
+        self.color_space_menu.aboutToShow.connect(self.populate_color_space_menu)
+        self.color_space_menu.triggered.connect(self.color_space_triggered)
+        
         self.create_node_renderer_cb.currentTextChanged.connect(self.renderer_node_switch)
         self.create_file_aces_ckb.toggled.connect(self.aces_checked)
         
@@ -1147,30 +1924,137 @@ class AGTools(QtWidgets.QWidget):
         self.create_file_linkuv_ckb.toggled.connect(lambda: self.change_checkbox_color(self.create_file_linkuv_ckb, '31d2b1'))
         self.create_file_udim_ckb.toggled.connect(lambda: self.change_checkbox_color(self.create_file_udim_ckb, '31d2b1'))
         self.create_file_aces_ckb.toggled.connect(lambda: self.change_checkbox_color(self.create_file_aces_ckb, '31d2b1'))
+        
+        self.select_file_path_btn.clicked.connect(self.show_file_select_dialog)
+        self.color_slider.color_changed.connect(self.on_color_changed)
+        
+    def create_rename_connections(self):
+        
+        self.rename_refresh_timer.timeout.connect(self.rename_refresh_items)
+        self.my_tab.currentChanged.connect(lambda: self.request_rename_refresh(True))
+        
+        self.rename_colorize_01_btn.clicked.connect(lambda: colorize(0.992, 0.231, 0.439))
+        self.rename_colorize_02_btn.clicked.connect(lambda: colorize(1.0, 0.494, 0.239))
+        self.rename_colorize_03_btn.clicked.connect(lambda: colorize(1.531999945640564, 0.8253204822540283, 0.4320240020751953))
+        self.rename_colorize_04_btn.clicked.connect(lambda: colorize(0.192, 0.824, 0.694))
+        self.rename_colorize_05_btn.clicked.connect(lambda: colorize(0.231, 0.553, 0.992))
+        self.rename_colorize_06_btn.clicked.connect(lambda: colorize(0.894, 0.314, 1.0))
+        self.rename_colorize_reset_btn.clicked.connect(lambda: reset_color())
+        self.rename_caps_ckb.clicked.connect(lambda: self.is_caps())
+        
+        self.rename_caps_ckb.clicked.connect(lambda: self.request_rename_refresh())
+        self.rename_separator_cb.currentTextChanged.connect(lambda: self.rename_separator_cb_changed())
+        self.rename_separator_le.textChanged.connect(lambda: self.request_rename_refresh())
+        self.rename_selection_cb.currentTextChanged.connect(lambda: self.request_rename_refresh(True))
+        self.rename_item_preview_ckb.toggled.connect(lambda: self.change_checkbox_color(self.rename_item_preview_ckb, '3b8dfd'))
+        self.rename_item_preview_ckb.toggled.connect(lambda: self.request_rename_refresh(True))
+        self.rename_item_preview_ckb.toggled.connect(lambda: self.update_selection_callback())
+        self.my_tab.currentChanged.connect(lambda: self.update_selection_callback())
+        self.rename_le.enter_pressed.connect(lambda: self.rename(True))
+        self.rename_le.textChanged.connect(lambda: self.request_rename_refresh())
+        self.rename_prefix_le.enter_pressed.connect(lambda: self.rename(True))
+        self.rename_prefix_le.textChanged.connect(lambda: self.request_rename_refresh())
+        self.rename_suffix_le.enter_pressed.connect(lambda: self.rename(True))
+        self.rename_suffix_le.textChanged.connect(lambda: self.request_rename_refresh())
+        self.rename_index_cb.currentTextChanged.connect(lambda: self.request_rename_refresh())
+        self.rename_template_le.textChanged.connect(lambda: self.request_rename_refresh())
+        self.rename_btn.clicked.connect(lambda: self.rename(True))
+        
         self.rename_caps_ckb.toggled.connect(lambda: self.change_checkbox_color(self.rename_caps_ckb, '3b8dfd'))
         self.rename_autosuffix_ckb.toggled.connect(lambda: self.change_checkbox_color(self.rename_autosuffix_ckb, '3b8dfd'))
         self.rename_autosuffix_ckb.toggled.connect(lambda: self.rename_suffix_le.setDisabled(self.rename_autosuffix_ckb.isChecked()))
-        self.rename_autosuffix_ckb.toggled.connect(lambda: self.rename_refresh_items())
+        self.rename_autosuffix_ckb.toggled.connect(lambda: self.request_rename_refresh())
         
         self.rename_clear_ckb.toggled.connect(lambda: self.change_checkbox_color(self.rename_clear_ckb, '3b8dfd'))
         
+    def create_export_connections(self):
+        
         self.export_mari_ckb.toggled.connect(lambda: self.change_checkbox_color(self.export_mari_ckb, 'fd3b70'))
         self.export_sp_ckb.toggled.connect(lambda: self.change_checkbox_color(self.export_sp_ckb, 'fd3b70'))
         self.export_spbake_ckb.toggled.connect(lambda: self.change_checkbox_color(self.export_spbake_ckb, 'fd3b70'))
         
-        #self.hardedges_slider_min
-        
-        #self.hardedges_label_min.set
-        #self.my_tab.tabBarClicked()
-        self.select_file_path_btn.clicked.connect(self.show_file_select_dialog)
-        #self.shader_name_ckb.toggled.connect(lambda: self.enableCheck(self.shader_name_ckb, self.create_shader_name_le))
-        
-        self.color_slider.color_changed.connect(self.on_color_changed)
-        #self.inst_btn.clicked.connect(self.test)
-        self.my_tab.currentChanged.connect(self.indexEvent)
-        #self.resizeEvent('re')
-        
-        #self.inst_btn.
+    def build_tab(self, index):
+        '''
+        widgets, layout, connections and jobs of a tab are only created the
+        first time the tab is selected
+        '''
+        if index < 0 or index in self.built_tabs:
+            return
+        self.built_tabs.add(index)
+        tab_name = self.my_tab.tabText(index).lower()
+        getattr(self, 'create_{}_widgets'.format(tab_name))()
+        getattr(self, 'create_{}_layout'.format(tab_name))()
+        getattr(self, 'create_{}_connections'.format(tab_name))()
+        
+        if tab_name == 'shader':
+            self.renderer_node_switch()
+        elif tab_name == 'rename':
+            self.selection_callback = EventCallback('SelectionChanged', self.rename_selection_changed)
+            self.auto_suffix.register_callbacks()
+            self.update_selection_callback()
+            self.rename_selection_cb.setCurrentIndex(AGT_UI_SETTINGS.value('rename_selection_cb', 1))
+            self.rename_index_cb.setCurrentIndex(AGT_UI_SETTINGS.value('rename_index_cb', 3))
+            self.rename_refresh_items()
+        
+    def quick_model_action(self, operation, axis, *args):
+        '''
+        marking menu entry of the instance/duplicate/mirror/flip buttons, the
+        object/world radio buttons pick the space
+        '''
+        space = 'world' if self.world_rb.isChecked() else 'object'
+        if axis == 'Auto':
+            autoAxis({'inst': 'inst', 'dupl': 'dup', 'mirr': 'mirror', 'flip': 'flip'}[operation], space=space)
+        elif axis == 'Radial':
+            radial_copy(
+                self.radial_count_sb.value(), axis=self.radial_axis_cb.currentText().lower(),
+                space=space, instance=operation == 'inst')
+        else:
+            axis_operations = {'inst': instance_axis, 'dupl': duplicate_axis, 'mirr': mirror_axis, 'flip': flip}
+            axis_operations[operation](axis.lower(), space=space)
+            
+    def scan_mesh_health(self):
+        '''
+        scan in the background, pressed again while running it cancels
+        '''
+        if self.health_job is not None:
+            self.health_job.cancel()
+            return
+        meshes = get_scan_meshes()
+        self.health_model.set_reports([])
+        self.health_progress.setRange(0, len(meshes))
+        self.health_progress.setValue(0)
+        self.health_progress.show()
+        self.health_scan_btn.setText('Cancel')
+        self.health_job = MeshJob(
+            meshes, read_mesh_buffers, scan_mesh_health,
+            on_result=lambda mesh, result: self.health_model.add_report(mesh_health_report(mesh, result)),
+            on_progress=lambda done, total: self.health_progress.setValue(done),
+            on_finished=self.mesh_health_finished)
+        self.health_job.start()
+        
+    def mesh_health_finished(self, cancelled):
+        self.health_job = None
+        self.health_progress.hide()
+        self.health_scan_btn.setText('Scan Meshes')
+        if not cancelled:
+            om.MGlobal.displayInfo('scanned {} meshes, {} with issues'.format(
+                len(self.health_model.reports), len(self.health_model.rows)))
+        
+    def select_health_issue(self, index):
+        names = selection_names(self.health_model.components(index))
+        if names:
+            mc.selectMode(component=True)
+            mc.select(names)
+        else:
+            mc.select(self.health_model.rows[index.row()].mesh)
+            
+    def start_hard_edge_preview(self):
+        if self.hardedges_preview_ckb.isChecked():
+            self.hard_edge_preview.start()
+            self.update_hard_edge_preview()
+            
+    def update_hard_edge_preview(self):
+        self.hard_edge_preview.update(self.hardedges_slider_min.value(), self.hardedges_slider_max.value())
         
     def value_to_label(self, slider, label):
         value = slider.value()
@@ -1202,6 +2086,25 @@ class AGTools(QtWidgets.QWidget):
             self.title_label.set_backgorund_color(QtGui.QColor(color))
             AGT_UI_SETTINGS.setValue('my_tab', index)
         
+    def populate_color_space_menu(self):
+        color_spaces = get_filtered_color_spaces()
+        if color_spaces is not self.color_space_menu_items:
+            self.color_space_menu_items = color_spaces
+            self.color_space_menu.clear()
+            for color_space in color_spaces:
+                self.color_space_menu.addAction(color_space)
+            self.color_space_menu.addSeparator()
+            for label, scope in [('Apply Rules to Selection', 'selection'), ('Apply Rules to Scene', 'scene')]:
+                action = self.color_space_menu.addAction(label)
+                action.setData(scope)
+                
+    def color_space_triggered(self, action):
+        scope = action.data()
+        if scope:
+            apply_color_space_rules(scope)
+        else:
+            set_color_space(action.text())
+        
     def on_color_changed(self, new_color):
         print('new color: ({0}, {1}, {2})'.format(new_color.red(), new_color.green(), new_color.blue()))
         
@@ -1310,6 +2213,7 @@ class AGTools(QtWidgets.QWidget):
             self.workspace_control_instance.set_label('AGTools RP Editions')
         else:
             self.workspace_control_instance.set_label('AGTools RP Editions')
+        self.update_selection_callback()
             
     def enableCheck(self, ckb, widgets):
         widgets.setEnabled(ckb.isChecked())
@@ -1375,32 +2279,44 @@ class AGTools(QtWidgets.QWidget):
     def rename(self, rename):
         
         clear_le_list = [self.rename_le, self.rename_suffix_le, self.rename_prefix_le]
-        for obj in self.selection_dict:
-            mc.rename(mc.ls(obj['uid'], l=True), obj['new_name'])
+        # sync the model with the latest selection and fields, even with preview off
+        self.rename_refresh_timer.stop()
+        if self.rename_selection_dirty:
+            self.rename_selection = self.rename_list_selection()
+            self.rename_selection_dirty = False
+        self.rename_update_new_names()
+        collisions = self.rename_item_model.find_collisions()
+        if collisions:
+            om.MGlobal.displayWarning('{} new names clash with a sibling and get numbered'.format(len(collisions)))
+        apply_renames(self.rename_item_model.resolve_all())
             
         if self.rename_clear_ckb.isChecked():
             for le in clear_le_list:
                 le.setText('')
  
+        self.rename_selection_dirty = True
         self.rename_refresh_items()
         return
         
     def create_shader(self):
         
         folder = self.create_shader_folder_le.text()
-        name = self.create_shader_name_le.text()
-        
-        print(folder)
-        print(name)
-        
-        print(self.create_shader_subfolder_ckb.isChecked())
-        print(self.create_shader_assign_ckb.isChecked())
-        print(self.create_shader_colorcorrect_ckb.isChecked())
-        
-        print(self.create_shader_renderer_cb.currentText())
-        print(self.create_shader_colorspace_cb.currentText())
-        print('create shader')
-        print('')
+        if not os.path.isdir(folder):
+            mc.inViewMessage(amg='Select a texture folder<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True, fst=5)
+            return
+        textures = group_textures(scan_texture_dir(folder, self.create_shader_subfolder_ckb.isChecked()))
+        name = '' if self.shader_name_ckb.isChecked() else self.create_shader_name_le.text()
+        assign = mc.ls(sl=True) if self.create_shader_assign_ckb.isChecked() else None
+        try:
+            materials, names = generate_shaders(
+                textures, renderer=self.create_shader_renderer_cb.currentText(), name=name,
+                color_correct=self.create_shader_colorcorrect_ckb.isChecked(), aces=self.create_file_aces_ckb.isChecked(),
+                color_space=self.create_shader_colorspace_cb.currentText() or None, assign=assign, link_repeat_uv=self.create_file_linkuv_ckb.isChecked())
+        except RuntimeError as e:
+            mc.inViewMessage(amg='{}<font color="#fdca3b"></font><br>.'.format(e), pos='topCenter', fade=True, fst=5)
+            mc.warning(str(e))
+            return
+        om.MGlobal.displayInfo('created {} materials from {}'.format(len(materials), folder))
         
     def create_file(self):
         file_colorspace = 'sRGB'
@@ -1421,17 +2337,14 @@ class AGTools(QtWidgets.QWidget):
                 file_colorspace = 'sRGB'
             else:
                 file_colorspace = 'Raw'
+        sel_tile = mc.ls(sl=True, type='place2dTexture')
+        network = FileNetwork(sel_tile[0] if sel_tile else None)
         for file in range(file_counts):
-            current_file = file_generator()
-            mc.setAttr('{}.colorSpace'.format(current_file), file_colorspace, type='string')
-            if link:
-                link_uv()
-            if udim:
-                print(current_file)
-                mc.setAttr('{}.uvTilingMode'.format(current_file), 3)
-                
-                
-                
+            network.add_file(color_space=file_colorspace, udim=udim)
+        if link:
+            network.link_repeat_uv()
+        network.build()
+        
         print(file_colorspace)
         
         print('create file')
@@ -1440,111 +2353,110 @@ class AGTools(QtWidgets.QWidget):
     def test(self):
         print('test')
         
-    def get_new_name(self, selection_dict, rename_setting_dict):
-        invalid_characters = ' !@#$%^&*()-=+[];:\'\"<>?{}\\/,|~.*'
-        zeros_padding = ''
-        old_name = selection_dict['name']
-        idx = selection_dict['index']
-        padding_length = rename_setting_dict['padding_length']
-        separator = rename_setting_dict['separator']
-        prefix = rename_setting_dict['prefix']
-        new_name = rename_setting_dict['new_name'] or old_name
-        suffix = rename_setting_dict['suffix']
-        
-        if padding_length and new_name != old_name:
-            zeros_padding = str(idx).zfill(padding_length)
+    def update_selection_callback(self):
+        '''
+        only listen to SelectionChanged while the rename preview is on screen
+        '''
+        if not self.selection_callback:
+            return
+        needed = (
+            self.isVisible()
+            and self.my_tab.currentWidget() is self.tab_rename
+            and self.rename_item_preview_ckb.isChecked()
+            )
+        if needed and not self.selection_callback.is_registered():
+            self.selection_callback.register()
+            # selection may have changed while nobody was listening
+            self.request_rename_refresh(True)
+        elif not needed:
+            self.selection_callback.remove()
             
-        new_name_full = [prefix, new_name, zeros_padding, suffix]
-        new_name_full = separator.join(filter(None, new_name_full))
+    def request_rename_refresh(self, selection_changed=False):
+        '''
+        coalesce bursts of edits and selection events into a single refresh
+        '''
+        if selection_changed:
+            self.rename_selection_dirty = True
+        self.rename_refresh_timer.start()
         
-        for char in invalid_characters:
-            new_name_full = new_name_full.replace(char, '_')
+    def rename_selection_changed(self):
+        self.request_rename_refresh(True)
         
-        return new_name_full
-
-                
     def rename_refresh_items(self):
         '''
-        referesh items depends on current state
+        referesh items depends on current state,
+        the selection is only queried again when it has changed
         '''
+        self.rename_refresh_timer.stop()
         is_preview_enabled = self.rename_item_preview_ckb.isChecked()
         current_tab_index = self.my_tab.currentIndex()
         if not is_preview_enabled or current_tab_index != 2:
-            self.rename_item_list_tree.clear()
-            self.rename_item_renamedlist_tree.clear()
+            self.rename_item_model.clear()
+            self.rename_selection_dirty = True
             return
-        self.selection_dict = self.rename_list_selection()
-        
-                
+        if self.rename_selection_dirty:
+            self.rename_selection = self.rename_list_selection()
+            self.rename_selection_dirty = False
+        self.rename_update_new_names()
+        self.rename_item_model.find_collisions()
                 
     def rename_list_selection(self):
-        clear = self.rename_clear_ckb.isChecked()
-        selection_dict = self.selection(self.rename_selection_cb.currentText().lower())
+        selection = self.selection(self.rename_selection_cb.currentText().lower())
+        
+        self.rename_item_count_label.setText(str(len(selection.uids)))
+        self.rename_item_model.set_items(selection)
+        
+        return selection
         
+    def rename_update_new_names(self):
+        '''
+        only invalidate the renamed/status columns, rows are computed by the
+        model when the view asks for them
+        '''
         rename_setting_dict = {
             'new_name' : self.rename_le.text(),
             'padding_length' : 0,
             'prefix' : self.rename_prefix_le.text(),
             'suffix' : self.rename_suffix_le.text(),
             'separator' : self.rename_separator_le.text(),
+            'template' : self.rename_template_le.text(),
             'apply_new_name' : False,
             'auto_suffix' : self.rename_autosuffix_ckb.isChecked()
         }
-        
-        self.rename_item_count_label.setText(str(len(selection_dict)))
-        self.rename_item_list_tree.clear()
-        self.rename_item_renamedlist_tree.clear()
-
 
         padding_length_str  = self.rename_index_cb.currentText()
         if padding_length_str != 'None':
             rename_setting_dict['padding_length'] = len(padding_length_str)
         
-        if selection_dict:
-            for obj in selection_dict:
-                item = self.rename_list_item(obj['name'])
-                self.rename_item_list_tree.addTopLevelItem(item)
-                obj['new_name'] = self.get_new_name(obj, rename_setting_dict)
-                renamed_item = self.rename_list_item(obj['new_name'])
-                self.rename_item_renamedlist_tree.addTopLevelItem(renamed_item)
-        
-        return selection_dict
+        suffixes = None
+        if rename_setting_dict['auto_suffix']:
+            suffixes = self.auto_suffix.suffixes(self.rename_selection.uids)
+            if self.caps:
+                suffixes = [suffix.upper() for suffix in suffixes]
         
-    def rename_list_item(self, name):
-        item = QtWidgets.QTreeWidgetItem([name])
-        return item
+        try:
+            self.rename_item_model.set_settings(rename_setting_dict, suffixes)
+            self.rename_template_le.setStyleSheet('')
+        except ValueError:
+            # unusable template, keep previewing with the default layout
+            self.rename_template_le.setStyleSheet('color: #fd3b70;')
+            rename_setting_dict['template'] = ''
+            self.rename_item_model.set_settings(rename_setting_dict, suffixes)
         
     def selection(self, selection_type='selected'):
-        READ_ONLY = mc.ls(['|top', '|front', '|persp', '|side'], uid=True)
-        selection = []
-        if selection_type == 'hierarchy':
-            selection = mc.ls(mc.ls(dagObjects=True, shapes=False, sl=True, tr=True), uid=True)
-        elif selection_type == 'selected':
-            selection = mc.ls(sl=True, tr=True, uid=True)
-        elif selection_type == 'all':
-            selection = mc.ls('*', tr=True, uid=True)
-        elif selection_type == 'group':
-            selection = mc.ls(
-                [i for obj in mc.ls(sl=True, tr=True, uid=True) 
-                for i in mc.listRelatives(mc.ls(obj, l=True), c=True, f=True) 
-                if mc.listRelatives(i, c=True, f=True)], 
-                uid=True
-                )
-        else:
+        try:
+            return resolve_selection(selection_type)
+        except ValueError:
             QtWidgets.QMessageBox.warning(self, 'Error', 'Invalid selection type')
-        selection_uid = [node for node in selection if node not in READ_ONLY]
-        selection_dict = [
-                {
-                    'uid':node, 
-                    'name':mc.ls(node)[0].split('|')[-1],
-                    'index':idx+1,
-                    'new_name':''
-                }
-                for idx, node in enumerate(selection_uid)
-            ]
-        return selection_dict
+            return SelectionColumns([], [], [], [], [])
         
     def hideEvent(self, e):
+        if self.selection_callback:
+            self.selection_callback.remove()
+        if getattr(self, 'health_job', None) is not None:
+            self.health_job.cancel()
+        if getattr(self, 'hard_edge_preview', None) is not None:
+            self.hard_edge_preview.stop()
         try:
             if self and self.parent():
                 ui_exist = True
@@ -1569,16 +2481,18 @@ class AGTools(QtWidgets.QWidget):
         
             
     def save_user_data(self):
-        mc.scriptJob(kill=self.job_update_selection, f=True)
-        print('clear jobs')
         AGT_UI_SETTINGS.setValue('my_tab', self.my_tab.currentIndex())
-        AGT_UI_SETTINGS.setValue('rename_selection_cb', self.rename_selection_cb.currentIndex())
-        AGT_UI_SETTINGS.setValue('rename_index_cb', self.rename_index_cb.currentIndex())
+        if self.selection_callback:
+            self.selection_callback.remove()
+        if self.my_tab.indexOf(self.tab_rename) in self.built_tabs:
+            self.auto_suffix.remove_callbacks()
+            AGT_UI_SETTINGS.setValue('rename_selection_cb', self.rename_selection_cb.currentIndex())
+            AGT_UI_SETTINGS.setValue('rename_index_cb', self.rename_index_cb.currentIndex())
      
     def set_user_data(self):
         self.my_tab.setCurrentIndex(AGT_UI_SETTINGS.value('my_tab', 0))
-        self.rename_selection_cb.setCurrentIndex(AGT_UI_SETTINGS.value('rename_selection_cb', 1))
-        self.rename_index_cb.setCurrentIndex(AGT_UI_SETTINGS.value('rename_index_cb', 3))
+        # index 0 does not emit currentChanged, build whatever tab is current
+        self.build_tab(self.my_tab.currentIndex())
         
      
 # if __name__ == "__main__":
@@ -1627,68 +2541,79 @@ def display():
     if not ui_exist:
         agt_ui = AGTools()
         
-display()
-
-def getFaceCenter(face):
-    vtxList = mc.xform(face, q = True, ws = True, t = True)
-    facePos = []
-    pos = None
-    side = int(len(vtxList)/3)
-    for obj in range(3):
-        round = range(3).index(obj)
-        for vtx in range(side):
-            vtxIndex = range(side).index(vtx)*3 + round
-            if not pos:
-                pos = vtxList[vtxIndex]
-            else:
-                pos = pos + vtxList[vtxIndex]
-            if vtx == side-1:
-                pos = pos / side
-                facePos.append(pos)
-                pos = 0
-    return facePos
-
-def getDistance(vectorA, vectorB):
-    distance = sqrt(pow(vectorA[0]-vectorB[0],2)+pow(vectorA[1]-vectorB[1],2)+pow(vectorA[2]-vectorB[2],2))
-    distance = float(distance)
-    return distance
-
-def autoAxis(operation = 'flip'):
-    sel_obj = mc.ls(sl = True)
+def benchmark_startup(module_name):
+    '''
+    time a fresh import of the tool module and the first display of the ui,
+    module_name is the name the tool is installed under on the script path
+    '''
+    if module_name == '__main__':
+        raise ValueError('benchmark the tool by its module name, __main__ cannot be imported again')
+    sys.modules.pop(module_name, None)
+    start_time = time.time()
+    module = __import__(module_name)
+    import_time = time.time() - start_time
+    
+    start_time = time.time()
+    module.display()
+    QtWidgets.QApplication.processEvents()
+    show_time = time.time() - start_time
+    
+    print('import {:.3f}s  first show {:.3f}s'.format(import_time, show_time))
+    return import_time, show_time
+    
+
+AXIS_NAMES = ['x', 'y', 'z']
+
+def get_axis_data(nodes):
+    '''
+    read object-space bounding boxes, the matrices taking them to world space
+    and world rotate pivots of all nodes in one pass, returns (bbox_min,
+    bbox_max, matrices, pivots). the box of a transform's own shape is in
+    object space and goes with its inclusive matrix, a group only has the
+    transform box, which is already in parent space, so it goes with the
+    exclusive matrix
+    '''
+    sel_list = om.MSelectionList()
+    for node in nodes:
+        sel_list.add(node)
+    count = sel_list.length()
+    bbox_min = np.zeros((count, 3))
+    bbox_max = np.zeros((count, 3))
+    matrices = np.zeros((count, 4, 4))
+    pivots = np.zeros((count, 3))
+    for idx in range(count):
+        dag_path = sel_list.getDagPath(idx)
+        shape_path = visible_shape(dag_path)
+        if shape_path is not None:
+            bbox = om.MFnDagNode(shape_path).boundingBox
+            matrix = dag_path.inclusiveMatrix()
+        else:
+            bbox = om.MFnDagNode(dag_path).boundingBox
+            matrix = dag_path.exclusiveMatrix()
+        bbox_min[idx] = list(bbox.min)[:3]
+        bbox_max[idx] = list(bbox.max)[:3]
+        matrices[idx] = np.reshape(list(matrix), (4, 4))
+        pivots[idx] = list(om.MFnTransform(dag_path).rotatePivot(om.MSpace.kWorld))[:3]
+    return bbox_min, bbox_max, matrices, pivots
+
+def autoAxis(operation = 'flip', space='object'):
+    sel_obj = mc.ls(sl = True, l = True, tr = True)
     if sel_obj:
         mc.undoInfo(openChunk=True)
-        for obj in sel_obj:
-            bBox = mc.geomToBBox(obj, ko = True, ns = '_bBox')[0]
-            objPos = mc.xform(obj, q = True, ws = True ,rp = True)
-            x_face_a_pos = getFaceCenter(bBox+'.f[3]')
-            x_face_b_pos = getFaceCenter(bBox+'.f[5]')
-            y_face_a_pos = getFaceCenter(bBox+'.f[1]')
-            y_face_b_pos = getFaceCenter(bBox+'.f[0]')
-            z_face_a_pos = getFaceCenter(bBox+'.f[2]')
-            z_face_b_pos = getFaceCenter(bBox+'.f[4]')
-            mc.delete(bBox)
-            allFacePos = [x_face_a_pos, x_face_b_pos, y_face_a_pos, y_face_b_pos, z_face_a_pos, z_face_b_pos]
-            all_distance = []
-            for pos in allFacePos:
-                all_distance.append(getDistance(objPos, pos))
-            min_distance = min(all_distance)
-            if min_distance == all_distance[0] or min_distance == all_distance[1]:
-                axis = 'x'
-            if min_distance == all_distance[2] or min_distance == all_distance[3]:
-                axis = 'y'
-            if min_distance == all_distance[4] or min_distance == all_distance[5]:
-                axis = 'z'
-            mc.select(obj)
-            if operation == 'inst':
-                instance_axis(axis)
-            elif operation == 'dup':
-                duplicate_axis(axis)
-            elif operation == 'mirror':
-                mirror_axis(axis)
-            elif operation == 'flip':
-                flip(axis)
-            else:
-                pass    
+        axes = nearest_face_axis(*get_axis_data(sel_obj))
+        axis_operations = {
+            'inst': lambda axis: instance_axis(AXIS_NAMES[axis], space=space),
+            'dup': lambda axis: duplicate_axis(AXIS_NAMES[axis], space=space),
+            'mirror': lambda axis: mirror_axis(axis, space=space),
+            'flip': lambda axis: flip(axis, space=space),
+        }
+        axis_operation = axis_operations.get(operation)
+        if axis_operation:
+            for axis in range(3):
+                axis_obj = [obj for obj, obj_axis in zip(sel_obj, axes) if obj_axis == axis]
+                if axis_obj:
+                    mc.select(axis_obj)
+                    axis_operation(axis)
         mc.select(sel_obj)
         mc.undoInfo(closeChunk=True)
     else:
@@ -1704,53 +2629,133 @@ def normal_instance():
         mc.inViewMessage(amg='Nothing selected<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True)
         
 
-def instance_axis(axis='x'):
+def axis_index(axis):
+    '''
+    0, 1 or 2 for an axis given as 'x'/'y'/'z' or as an index
+    '''
+    if axis in AXIS_NAMES:
+        return AXIS_NAMES.index(axis)
+    if axis in (0, 1, 2):
+        return axis
+    raise ValueError('axis should be x, y, z or 0 to 2, got {!r}'.format(axis))
+
+def world_matrices(nodes):
+    '''
+    world matrices (n, 4, 4) and world rotate pivots (n, 3) of nodes in one pass
+    '''
+    sel_list = om.MSelectionList()
+    for node in nodes:
+        sel_list.add(node)
+    matrices = np.zeros((len(nodes), 4, 4))
+    pivots = np.zeros((len(nodes), 3))
+    for idx in range(sel_list.length()):
+        dag_path = sel_list.getDagPath(idx)
+        matrices[idx] = np.reshape(list(dag_path.inclusiveMatrix()), (4, 4))
+        pivots[idx] = list(om.MFnTransform(dag_path).rotatePivot(om.MSpace.kWorld))[:3]
+    return matrices, pivots
+
+def world_mirror_matrices(matrices, axis):
+    '''
+    matrices mirrored across the world plane through the origin facing axis
+    '''
+    mirror = np.eye(4)
+    mirror[axis_index(axis), axis_index(axis)] = -1
+    # maya matrices use row vectors, world space transforms multiply on the right
+    return np.einsum('nij,jk->nik', np.asarray(matrices, dtype=float), mirror)
+
+def radial_matrices(matrices, pivots, axes, count):
+    '''
+    count - 1 copies of every matrix rotated evenly around its pivot and axis,
+    returns (n, count - 1, 4, 4), axes are (n, 3) world directions
+    '''
+    matrices = np.asarray(matrices, dtype=float).reshape(-1, 4, 4)
+    pivots = np.asarray(pivots, dtype=float).reshape(-1, 3)
+    axes = np.asarray(axes, dtype=float).reshape(-1, 3)
+    axes = axes / np.linalg.norm(axes, axis=1)[:, None]
+    angles = 2 * np.pi * np.arange(1, count) / count
+    
+    # rodrigues rotation per object and angle, transposed for row vectors
+    cos = np.cos(angles)[None, :, None, None]
+    sin = np.sin(angles)[None, :, None, None]
+    cross = np.zeros((len(axes), 3, 3))
+    cross[:, 0, 1], cross[:, 0, 2], cross[:, 1, 2] = -axes[:, 2], axes[:, 1], -axes[:, 0]
+    cross -= cross.transpose(0, 2, 1)
+    outer = np.einsum('ni,nj->nij', axes, axes)[:, None]
+    rotations = (cos * np.eye(3) + sin * cross[:, None] + (1 - cos) * outer).transpose(0, 1, 3, 2)
+    
+    # rotate about the pivot: p' = (p - pivot) * R + pivot
+    radial = np.zeros(rotations.shape[:2] + (4, 4))
+    radial[..., :3, :3] = rotations
+    radial[..., 3, :3] = pivots[:, None] - np.einsum('ni,nkij->nkj', pivots, rotations)
+    radial[..., 3, 3] = 1
+    return np.einsum('nij,nkjl->nkil', matrices, radial)
+
+def set_world_matrices(nodes, matrices):
+    for node, matrix in zip(nodes, np.asarray(matrices).reshape(-1, 16).tolist()):
+        mc.xform(node, ws=True, m=matrix)
+
+def mirror_scales(nodes, axis, space='object'):
+    '''
+    mirror every node on one axis, in object space with a single relative
+    xform (the same as writing current_scale * [-1, 1, 1] to each node), in
+    world space across the world plane through the origin
+    '''
+    if space == 'world':
+        set_world_matrices(nodes, world_mirror_matrices(world_matrices(nodes)[0], axis))
+        return
+    scale = np.ones(3)
+    scale[axis_index(axis)] = -1
+    mc.xform(nodes, r=True, s=scale.tolist())
+
+def copy_axis(axis='x', instance=True, space='object'):
+    '''
+    instance or duplicate the selected transforms in one call and mirror the
+    originals on axis, the copies keep the original orientation
+    '''
     mc.undoInfo(openChunk=True)
-    if mc.ls(sl=True):
-        sel_obj = mc.ls(sl=True)
-        for obj in sel_obj:
-            obj_scale_x = mc.getAttr(obj+'.scaleX')
-            obj_scale_y = mc.getAttr(obj+'.scaleY')
-            obj_scale_z = mc.getAttr(obj+'.scaleZ')
-            instance_mesh = mc.instance(obj)
-            mc.ls(sl = True)
-            mc.scale(obj_scale_x, obj_scale_y, obj_scale_z, obj)
-            if axis == 'x':
-                mc.scale(obj_scale_x*-1, obj_scale_y, obj_scale_z, obj)
-            elif axis == 'y':
-                mc.scale(obj_scale_x, obj_scale_y*-1, obj_scale_z, obj)
-            elif axis == 'z':
-                mc.scale(obj_scale_x, obj_scale_y, obj_scale_z*-1, obj)
-            else:
-                continue
-            mc.select(obj, add = True)
-            mc.select(instance_mesh[0], add = True)
+    sel_obj = mc.ls(sl=True, tr=True, l=True)
+    if sel_obj:
+        copies = mc.instance(sel_obj) if instance else mc.duplicate(sel_obj, rr=True)
+        mirror_scales(sel_obj, axis, space)
+        mc.select(sel_obj + copies)
     else:
         mc.warning("nothing selected")
-        
     mc.undoInfo(closeChunk=True)
+
+def instance_axis(axis='x', space='object'):
+    copy_axis(axis, instance=True, space=space)
+    
+def duplicate_axis(axis='x', space='object'):
+    copy_axis(axis, instance=False, space=space)
     
-def duplicate_axis(axis='x'):
+def radial_copy(count=6, axis='y', space='object', instance=True):
+    '''
+    count - 1 rotated copies of every selected transform spread evenly around
+    axis, through each object's own pivot and local axis in object space or
+    through the world origin in world space, instances share one shape
+    '''
+    sel_obj = mc.ls(sl=True, tr=True, l=True)
+    if not sel_obj:
+        mc.inViewMessage(amg='Nothing selected<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True)
+        return []
     mc.undoInfo(openChunk=True)
-    sel_obj = mc.ls(sl=True)
-    if sel_obj:
-        for obj in sel_obj:
-            obj_scale_x = mc.getAttr(obj+'.scaleX')
-            obj_scale_y = mc.getAttr(obj+'.scaleY')
-            obj_scale_z = mc.getAttr(obj+'.scaleZ')
-            dup = mc.duplicate(obj)
-            mc.scale(obj_scale_x, obj_scale_y, obj_scale_z, obj)
-            if axis == 'x':
-                mc.scale(obj_scale_x*-1, obj_scale_y, obj_scale_z, obj)
-            elif axis == 'y':
-                mc.scale(obj_scale_x, obj_scale_y*-1, obj_scale_z, obj)
-            elif axis == 'z':
-                mc.scale(obj_scale_x, obj_scale_y, obj_scale_z*-1, obj)
-            else:
-                print('axis should be less than 3')
-            mc.select(obj, add=True)
-            mc.select(dup[0], add=True)
+    matrices, pivots = world_matrices(sel_obj)
+    if space == 'world':
+        pivots = np.zeros_like(pivots)
+        axes = np.repeat(np.eye(3)[axis_index(axis)][None], len(sel_obj), axis=0)
+    else:
+        axes = matrices[:, axis_index(axis), :3]
+    targets = radial_matrices(matrices, pivots, axes, count)
+    
+    copies = []
+    for copy_id in range(count - 1):
+        # instancing an instance still shares the original shape
+        new_obj = mc.instance(sel_obj) if instance else mc.duplicate(sel_obj, rr=True)
+        set_world_matrices(new_obj, targets[:, copy_id])
+        copies.extend(new_obj)
+    mc.select(sel_obj + copies)
     mc.undoInfo(closeChunk=True)
+    return copies
         
 def instance_to_object():
     mc.undoInfo(openChunk=True)
@@ -1807,59 +2812,36 @@ def btCombine():
         #mc.undoInfo(closeChunk=True)
     
 
-def mirror_axis(x=0):
+def mirror_axis(x=0, space='object'):
     mc.undoInfo(openChunk=True)
     sel_obj = mc.ls(sl=True)
     if sel_obj:
+        mc.delete(sel_obj, ch=True)
         for obj in sel_obj:
-            mc.select(obj)
-            mc.DeleteHistory()
-            mc.polyMirrorFace(cutMesh = 0, axis=x, mirror_axis=1, mergeMode=0, mirrorPosition=0)
-            mc.polyMergeVertex(d=0.0001)
-            mc.polySoftEdge()   
-            mc.DeleteHistory()
+            mc.polyMirrorFace(obj, cutMesh = 0, axis=axis_index(x), mirrorAxis=2 if space == 'world' else 1,
+                              mergeMode=0, mirrorPosition=0)
+            mc.polyMergeVertex(obj, d=0.0001)
+            mc.polySoftEdge(obj)
+        mc.delete(sel_obj, ch=True)
         om.MGlobal.displayInfo("successfully mirrored")
         mc.select(sel_obj)
     else:
         mc.inViewMessage(amg='Nothing selected<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True)
     mc.undoInfo(closeChunk=True)
     
-def flip(x=0):
+def flip(x=0, space='object'):
     mc.undoInfo(openChunk=True)
-    obj = mc.ls(sl=True)
-    if mc.ls(selection=True) :
-        obj_scale_x = mc.getAttr(obj[0]+'.scaleX')
-        obj_scale_y = mc.getAttr(obj[0]+'.scaleY')
-        obj_scale_z = mc.getAttr(obj[0]+'.scaleZ')
-    if x == 0 and mc.ls(selection=True) :
-        print('flip X')
-        mc.scale(obj_scale_x*-1, obj_scale_y, obj_scale_z)
-    elif x == 1 and mc.ls(selection=True) :
-        print('flip Y')
-        mc.scale(obj_scale_x, obj_scale_y*-1, obj_scale_z)     
-    elif x == 2 and mc.ls(selection=True) :
-        print('flip Z')
-        mc.scale(obj_scale_x, obj_scale_y, obj_scale_z*-1)
+    sel_obj = mc.ls(sl=True, tr=True, l=True)
+    if sel_obj:
+        mirror_scales(sel_obj, x, space)
+        print('flip {}'.format(AXIS_NAMES[axis_index(x)].upper()))
     else :
         mc.inViewMessage(amg='Nothing selected<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True)
     mc.undoInfo(closeChunk=True)
 
 
 def toEdge(ep):
-    sel_obj = mc.ls(sl=True, flatten = True)
-    faces = mc.filterExpand(selectionMask = 34) or []
-    edge_perimeter = []
-    if faces and ep:
-        sel_obj = list(set(sel_obj).difference(set(faces)))
-        mc.select(faces)
-        mel.eval('{string $c[]; string $f[]; convertToSelectionBorder(-1, true, $c, $f);}')
-        edge_perimeter = mc.ls(sl = True, flatten = True) or []
-    convCpnt = mc.polyListComponentConversion(sel_obj, te=True)
-    mc.select(convCpnt)
-    edges = mc.ls(sl = True, flatten = True)
-    edges.extend(edge_perimeter)
-    edges = list(set(edges))
-    mc.filterExpand(edges, sm = 32)
+    edges = selection_names(edge_sets(ep))
     mc.select(edges)
     return edges
 
@@ -1878,38 +2860,47 @@ def to_obj_set_subd_level(in_mesh, subd_level, adjust_subd):
             mc.setAttr(str(obj)+'.smoothLevel', subd_level)
     return transform
 
+def crease_edges(edge_sets, values):
+    '''
+    crease edge ComponentSets with one polyCrease per mesh and distinct value
+    
+    values is a single crease value or {mesh: array} with one value per index
+    of that mesh's set, creaseSet gains the creased edges and loses the ones
+    set to 0 in one sets call each
+    '''
+    added = []
+    removed = []
+    for edges in edge_sets:
+        edge_values = values.get(edges.mesh, 0) if isinstance(values, dict) else values
+        edge_values = np.broadcast_to(np.asarray(edge_values, dtype=np.float64), edges.indices.shape)
+        distinct, inverse = np.unique(edge_values, return_inverse=True)
+        for value_id, value in enumerate(distinct.tolist()):
+            names = edges.copy(edges.indices[inverse.ravel() == value_id]).names()
+            mc.polyCrease(names, value=value)
+            (added if value else removed).extend(names)
+            
+    if not mc.objExists('creaseSet'):
+        mc.sets(n = 'creaseSet', em = True)
+    if added:
+        mc.sets(added, add = 'creaseSet', e = True)
+    if removed:
+        mc.sets(removed, rm = 'creaseSet', e = True)
+
 def creasing(creasingValue):
     sel_obj = mc.ls(sl=True)
         
     def crease(v):
-        sel_edge = toEdge(True)
-        mc.select(sel_edge)
-        if not mc.objExists('creaseSet'):
-            mc.sets(n = 'creaseSet')
-            
-        for edge in sel_edge:
-            mc.polyCrease(edge, value=v)
-        if v != 0:
-            mc.sets(sel_edge, add = 'creaseSet', e = True)
-            transform = to_obj_set_subd_level(sel_edge, 4, True)
-        else:
-            mc.sets(sel_edge, rm = 'creaseSet', e = True)
-            transform = to_obj_set_subd_level(sel_edge, 2, True)
-            creaseSetList = mc.sets('creaseSet', q = True) or []
-            creaseSetListTransform = []
-            for obj in creaseSetList:
-                try:
-                    mesh = obj.split('.')[0]
-                except:
-                    mesh = obj
-                creaseSetListTransform.append(mesh)
-            transform = list(set(transform).intersection(set(creaseSetListTransform)))
-            if transform:
-                to_obj_set_subd_level(sel_edge, 4, True)
+        sel_edge = edge_sets(True)
+        edge_names = selection_names(sel_edge)
+        mc.select(edge_names)
+        crease_edges(sel_edge, v)
+        transform = to_obj_set_subd_level(edge_names, 4 if v != 0 else 2, True)
+        if v == 0:
+            to_obj_set_subd_level([mesh for mesh in transform if MESH_CREASES.has_creases(mesh)], 4, True)
         mc.select(transform)
         mc.DeleteHistory()
         mel.eval('setSelectMode components Components; selectType -smp 0 -sme 1 -smf 0 -smu 0 -pv 0 -pe 1 -pf 0 -puv 0; HideManipulators; ')
-        mc.select(sel_edge)
+        mc.select(edge_names)
 
     mc.undoInfo(openChunk=True)   
         
@@ -1933,30 +2924,22 @@ def creasing(creasingValue):
     mc.undoInfo(closeChunk=True)
     
 def select_crease():
-    if mc.objExists('creaseSet'):
-        select_edges = toEdge(False)
-        creased_edges = mc.sets('creaseSet', q = True)
-        creased_edges = mc.ls(creased_edges, flatten = True)
-        select_creased_edge = list(set(creased_edges).intersection(select_edges))
-        de_select = list(set(creased_edges).difference(select_edges))
-        transform = to_obj_set_subd_level(select_edges, 2, False)
-        mc.select(transform)
-        mel.eval('setSelectMode components Components; selectType -smp 0 -sme 1 -smf 0 -smu 0 -pv 0 -pe 1 -pf 0 -puv 0; HideManipulators; ')
-
-        if len(transform) == 1:
-            mc.select(select_creased_edge)
-        else:
-            mc.select(creased_edges)
-            mc.select(de_select, d = True)
-        return select_creased_edge
+    select_edges = edge_sets(False)
+    select_creased_edge = []
+    for edges in select_edges:
+        if MESH_CREASES.has_creases(edges.mesh):
+            select_creased_edge.extend((MESH_CREASES.edges(edges.mesh) & edges).names())
+    transform = to_obj_set_subd_level(selection_names(select_edges), 2, False)
+    mc.select(transform)
+    mel.eval('setSelectMode components Components; selectType -smp 0 -sme 1 -smf 0 -smu 0 -pv 0 -pe 1 -pf 0 -puv 0; HideManipulators; ')
+    mc.select(select_creased_edge)
+    return select_creased_edge
 
 def nonmanifold():
     sel_obj = mc.ls(sl = True)
     if sel_obj:
-        monmani = mc.polyInfo( nme=True, nmv=True )
         mc.selectMode(component=True)
-        mc.select(monmani)
-        sel_edge = mc.ls(sl=True)
+        sel_edge = select_mesh_issues(scan_meshes(get_scan_meshes()), ['Non-Manifold Edges', 'Non-Manifold Vertices'])
         if not sel_edge :
             mc.inViewMessage(amg='<font color="#31d2b1">Your mesh is good</font><br>.', pos='topCenter', fade=True)
             mc.select(sel_obj)
@@ -1965,22 +2948,17 @@ def nonmanifold():
         #mc.warning("Nothing selected") 
         
 def select_bad_mesh(selType):
-    # 1 nonquad, 2 concave, 3 ngons, 4 tris
+    checks = {
+        'Non-Quad': ['Triangles', 'N-Gons'],
+        'Concave': ['Concave'],
+        'N-Gons': ['N-Gons'],
+        'Triangles': ['Triangles'],
+    }[selType]
     sel_obj = mc.ls(sl = True)
     if sel_obj:
         mc.selectMode(component=True)
         mc.selectType(facet=True)
-        if selType == 'Non-Quad':
-            mc.polySelectConstraint(mode=3, type=0x0008, size=2)
-            mc.InvertSelection()
-        elif selType == 'Concave':
-            mc.polySelectConstraint(mode=3, type=0x0008, c=1)
-        elif selType == 'N-Gons':
-            mc.polySelectConstraint(mode=3, type=0x0008, size=3)
-        elif selType == 'Triangles':
-            mc.polySelectConstraint(mode=3, type=0x0008, size=1)
-        mc.polySelectConstraint(disable=True)
-        sel_poly = mc.ls(sl=True)
+        sel_poly = select_mesh_issues(scan_meshes(get_scan_meshes()), checks)
         if sel_poly:
             return sel_poly
         else:
@@ -1990,26 +2968,561 @@ def select_bad_mesh(selType):
         mc.inViewMessage(amg='Nothing selected<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True, fst=5)
         #mc.warning("nothing selected")
 
+COMPONENT_PATTERN = re.compile(r'^(.+)\.(e|f|vtx|map)\[(\d+)(?::(\d+))?\]$')
+
+def newell_vectors(points, face_vertex_counts, face_vertices):
+    '''
+    newell's vector of every face, it points along the face normal and its
+    length is twice the face area, faces are given as vertex counts and the
+    flat vertex ids in winding order
+    '''
+    face_vertex_counts = np.asarray(face_vertex_counts, dtype=np.int64)
+    face_vertices = np.asarray(face_vertices, dtype=np.int64)
+    starts = np.cumsum(face_vertex_counts) - face_vertex_counts
+    crosses = np.cross(points[face_vertices], points[face_vertices[next_face_vertex(face_vertex_counts)]])
+    return np.add.reduceat(crosses, starts, axis=0) if len(starts) else crosses[:0]
+
+def next_face_vertex(face_vertex_counts):
+    '''
+    position of the next face vertex for every flat face vertex, the last
+    vertex of each face wraps to its first
+    '''
+    starts = np.cumsum(face_vertex_counts) - face_vertex_counts
+    next_ids = np.arange(1, int(np.sum(face_vertex_counts)) + 1)
+    next_ids[starts + face_vertex_counts - 1] = starts
+    return next_ids
+
+def face_normals(points, face_vertex_counts, face_vertices):
+    '''
+    unit normal of every face with newell's method
+    '''
+    normals = newell_vectors(points, face_vertex_counts, face_vertices)
+    lengths = np.linalg.norm(normals, axis=1)
+    return normals / np.where(lengths > 0, lengths, 1)[:, None]
+
+def edge_dihedral_angles(points, face_vertex_counts, face_vertices, topology):
+    '''
+    angle in degrees between the normals of the two faces of every edge, nan
+    for border and non-manifold edges
+    '''
+    normals = face_normals(points, face_vertex_counts, face_vertices)
+    angles = np.full(topology.num_edges, np.nan)
+    starts = topology.edge_face_offsets[:-1]
+    manifold = np.flatnonzero(topology.edge_face_offsets[1:] - starts == 2)
+    face_a = topology.edge_face_ids[starts[manifold]]
+    face_b = topology.edge_face_ids[starts[manifold] + 1]
+    dots = np.einsum('ij,ij->i', normals[face_a], normals[face_b])
+    angles[manifold] = np.degrees(np.arccos(np.clip(dots, -1, 1)))
+    return angles
+
+def scan_mesh_health(points, face_vertex_counts, face_vertices, topology, area_tolerance=1e-10):
+    '''
+    every MESH_HEALTH_CHECKS category of one mesh in a single pass over its
+    face-vertex and edge-face arrays, returns {check name: sorted indices}
+    
+    non-manifold vertices are the ends of non-manifold edges and vertices
+    where more than two border edges meet (bowties)
+    '''
+    face_vertex_counts = np.asarray(face_vertex_counts, dtype=np.int64)
+    face_vertices = np.asarray(face_vertices, dtype=np.int64)
+    starts = np.cumsum(face_vertex_counts) - face_vertex_counts
+    newell = newell_vectors(points, face_vertex_counts, face_vertices)
+    
+    # a corner turning against the face normal makes the face concave
+    next_ids = next_face_vertex(face_vertex_counts)
+    previous_ids = np.empty_like(next_ids)
+    previous_ids[next_ids] = np.arange(len(next_ids))
+    corners = points[face_vertices]
+    turns = np.cross(corners - points[face_vertices[previous_ids]], points[face_vertices[next_ids]] - corners)
+    face_ids = np.repeat(np.arange(len(face_vertex_counts)), face_vertex_counts)
+    against = np.einsum('ij,ij->i', turns, newell[face_ids]) < 0
+    concave = np.logical_or.reduceat(against, starts) if len(starts) else against[:0]
+    concave &= face_vertex_counts > 3
+    
+    # faces using exactly the same vertices as another face
+    lamina = np.zeros(len(face_vertex_counts), dtype=bool)
+    for count in np.unique(face_vertex_counts).tolist():
+        faces = np.flatnonzero(face_vertex_counts == count)
+        rows = np.sort(face_vertices[starts[faces][:, None] + np.arange(count)], axis=1)
+        unused, inverse, duplicates = np.unique(rows, axis=0, return_inverse=True, return_counts=True)
+        lamina[faces[duplicates[inverse.ravel()] > 1]] = True
+        
+    edge_face_counts = np.diff(topology.edge_face_offsets)
+    non_manifold_edges = np.flatnonzero(edge_face_counts > 2)
+    border_vertices = topology.edge_vertices[edge_face_counts == 1].ravel()
+    bowties = np.flatnonzero(np.bincount(border_vertices, minlength=topology.num_vertices) > 2)
+    non_manifold_vertices = np.union1d(topology.edge_vertices[non_manifold_edges].ravel(), bowties)
+    
+    return {
+        'Triangles': np.flatnonzero(face_vertex_counts == 3),
+        'Quads': np.flatnonzero(face_vertex_counts == 4),
+        'N-Gons': np.flatnonzero(face_vertex_counts > 4),
+        'Concave': np.flatnonzero(concave),
+        'Non-Manifold Edges': non_manifold_edges,
+        'Non-Manifold Vertices': non_manifold_vertices,
+        'Lamina': np.flatnonzero(lamina),
+        'Zero Area': np.flatnonzero(np.linalg.norm(newell, axis=1) * 0.5 <= area_tolerance),
+    }
+
+def read_mesh_buffers(mesh):
+    '''
+    plain numpy buffers scan_mesh_health needs, maya is only touched here
+    '''
+    fn_mesh = om.MFnMesh(mesh_dag_path(mesh))
+    points = np.array(fn_mesh.getPoints(om.MSpace.kObject), dtype=np.float64)[:, :3]
+    face_vertex_counts, face_vertices = fn_mesh.getVertices()
+    return (points, np.array(face_vertex_counts, dtype=np.int64), np.array(face_vertices, dtype=np.int64),
+            MESH_TOPOLOGY.get(mesh))
+
+def scan_meshes(meshes, max_workers=None):
+    '''
+    MeshHealthReport per mesh, buffers are read on the calling thread and
+    the checks run in a thread pool. meshes that cannot be read are skipped
+    with a warning like MeshJob does
+    '''
+    read_meshes = []
+    buffers = []
+    for mesh in meshes:
+        try:
+            buffers.append(read_mesh_buffers(mesh))
+        except RuntimeError as e:
+            om.MGlobal.displayWarning('skipped {}: {}'.format(mesh, e))
+            continue
+        read_meshes.append(mesh)
+    max_workers = max_workers or min(8, os.cpu_count() or 1)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(lambda mesh_buffers: scan_mesh_health(*mesh_buffers), buffers))
+    return [mesh_health_report(mesh, result) for mesh, result in zip(read_meshes, results)]
+
+class MeshJob(object):
+    '''
+    runs analyse over many meshes without blocking maya
+    
+    read(mesh) is called on the main thread a few meshes per idle tick and
+    must return plain buffers, analyse(*buffers) runs in a thread pool and
+    on_result(mesh, result), on_progress(done, total) and on_finished(cancelled)
+    are called back on the main thread through executeDeferred
+    '''
+    
+    CHUNK_SIZE = 8
+    
+    def __init__(self, meshes, read, analyse, on_result=None, on_progress=None, on_finished=None, max_workers=None):
+        self.meshes = list(meshes)
+        self.read = read
+        self.analyse = analyse
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.on_finished = on_finished
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.pool = None
+        self.futures = []
+        self.read_count = 0
+        self.done_count = 0
+        self.cancelled = False
+        self.finished = False
+        
+    def start(self):
+        self.pool = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+        if self.meshes:
+            maya.utils.executeDeferred(self.read_chunk)
+        else:
+            self.finish()
+            
+    def read_chunk(self):
+        if self.cancelled:
+            return
+        chunk = self.meshes[self.read_count:self.read_count + self.CHUNK_SIZE]
+        self.read_count += len(chunk)
+        for mesh in chunk:
+            try:
+                buffers = self.read(mesh)
+            except RuntimeError as e:
+                # deleted or renamed since the job started
+                om.MGlobal.displayWarning('skipped {}: {}'.format(mesh, e))
+                self.deliver(mesh, None)
+                continue
+            future = self.pool.submit(self.analyse, *buffers)
+            future.add_done_callback(partial(self.on_done, mesh))
+            self.futures.append(future)
+        if self.read_count < len(self.meshes):
+            maya.utils.executeDeferred(self.read_chunk)
+            
+    def on_done(self, mesh, future):
+        # worker thread, nothing but handing the result to the main thread
+        if not future.cancelled() and not self.cancelled:
+            maya.utils.executeDeferred(partial(self.deliver, mesh, future))
+            
+    def deliver(self, mesh, future):
+        if self.cancelled or self.finished:
+            return
+        self.done_count += 1
+        if future is not None:
+            if future.exception() is not None:
+                om.MGlobal.displayWarning('{} failed: {}'.format(mesh, future.exception()))
+            elif self.on_result:
+                self.on_result(mesh, future.result())
+        if self.on_progress:
+            self.on_progress(self.done_count, len(self.meshes))
+        if self.done_count == len(self.meshes):
+            self.finish()
+            
+    def cancel(self):
+        if self.finished:
+            return
+        self.cancelled = True
+        for future in self.futures:
+            future.cancel()
+        self.finish()
+        
+    def finish(self):
+        self.finished = True
+        self.futures = []
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+        if self.on_finished:
+            self.on_finished(self.cancelled)
+            
+
+def mesh_health_report(mesh, result):
+    issues = dict((name, ComponentSet(mesh, kind, result[name])) for name, header, kind in MESH_HEALTH_CHECKS)
+    return MeshHealthReport(mesh, issues)
+
+def get_scan_meshes():
+    '''
+    long names of the selected mesh transforms, every mesh when nothing is selected
+    '''
+    sel_obj = mc.ls(sl=True, o=True)
+    shapes = mc.ls(sel_obj, dag=True, type='mesh', ni=True, l=True) if sel_obj else mc.ls(type='mesh', ni=True, l=True)
+    if not shapes:
+        # listRelatives with an empty list falls back to the selection
+        return []
+    return sorted(set(mc.listRelatives(shapes, p=True, f=True) or []))
+
+def select_mesh_issues(reports, checks):
+    names = []
+    for report in reports:
+        for check in checks:
+            names.extend(report.issues[check].names())
+    if names:
+        mc.select(names)
+    return names
+
+def visible_shape(dag_path):
+    '''
+    first shape directly below a transform that is not an intermediate object
+    (like the Orig shape of a skinned or blendshaped mesh), None without one
+    '''
+    for shape_idx in range(dag_path.numberOfShapesDirectlyBelow()):
+        shape_path = om.MDagPath(dag_path)
+        shape_path.extendToShapeDirectlyBelow(shape_idx)
+        if not om.MFnDagNode(shape_path).isIntermediateObject:
+            return shape_path
+    return None
+
+def mesh_dag_path(mesh):
+    '''
+    dag path of the mesh shape of mesh (a transform, shape or component name),
+    raises RuntimeError when it is not a polygon mesh
+    '''
+    selection_list = om.MSelectionList()
+    selection_list.add(mesh.split('.')[0])
+    dag_path = selection_list.getDagPath(0)
+    if not dag_path.node().hasFn(om.MFn.kShape):
+        dag_path = visible_shape(dag_path)
+    if dag_path is None or not dag_path.node().hasFn(om.MFn.kMesh):
+        raise RuntimeError('{} is not a mesh'.format(mesh))
+    return dag_path
+
+def read_mesh_topology(dag_path):
+    '''
+    adjacency of a mesh shape in one pass over its edges and faces
+    '''
+    fn_mesh = om.MFnMesh(dag_path)
+    
+    edge_vertices = np.empty((fn_mesh.numEdges, 2), dtype=np.int32)
+    for edge_id in range(fn_mesh.numEdges):
+        edge_vertices[edge_id] = fn_mesh.getEdgeVertices(edge_id)
+        
+    face_edge_counts = []
+    face_edges = []
+    face_it = om.MItMeshPolygon(dag_path)
+    for face_id in range(fn_mesh.numPolygons):
+        face_it.setIndex(face_id)
+        edges = face_it.getEdges()
+        face_edge_counts.append(len(edges))
+        face_edges.extend(edges)
+    return MeshTopology(edge_vertices, face_edge_counts, face_edges)
+
+def read_mesh_uvs(mesh):
+    '''
+    vertex and uv shell of every uv in the current uv set, uvs no face uses
+    get vertex -1
+    '''
+    fn_mesh = om.MFnMesh(mesh_dag_path(mesh))
+    face_vertex_counts, face_vertices = fn_mesh.getVertices()
+    face_uv_counts, face_uvs = fn_mesh.getAssignedUVs()
+    face_vertex_counts = np.array(face_vertex_counts, dtype=np.int32)
+    # faces without uvs have no entries in face_uvs
+    mapped = np.repeat(np.array(face_uv_counts, dtype=np.int32) == face_vertex_counts, face_vertex_counts)
+    uv_vertices = np.full(fn_mesh.numUVs(), -1, dtype=np.int32)
+    uv_vertices[np.array(face_uvs, dtype=np.int64)] = np.array(face_vertices, dtype=np.int32)[mapped]
+    uv_shells = np.array(fn_mesh.getUvShellsIds()[1], dtype=np.int32)
+    return uv_vertices, uv_shells
+
+class MeshCache(object):
+    '''
+    data read from a mesh shape, cached per uuid until the node callback
+    added by add_node_callback fires for that mesh. subclasses define
+    read(dag_path) returning the data and add_node_callback(node, func)
+    returning a callback id
+    '''
+    
+    def __init__(self):
+        self.cache = {}
+        self.callback_ids = {}
+        self.scene_callback_ids = []
+        
+    def get(self, mesh):
+        '''
+        cached data of mesh (a transform, shape or component name), raises
+        RuntimeError when it is not a polygon mesh
+        '''
+        dag_path = mesh_dag_path(mesh)
+        node = dag_path.node()
+        uid = om.MFnDependencyNode(node).uuid().asString()
+        
+        data = self.cache.get(uid)
+        if data is None:
+            data = self.read(dag_path)
+            self.cache[uid] = data
+            self.register_callbacks(uid, node)
+        return data
+        
+    def register_callbacks(self, uid, node):
+        if not self.scene_callback_ids:
+            for message in [om.MSceneMessage.kAfterNew, om.MSceneMessage.kAfterOpen]:
+                self.scene_callback_ids.append(om.MSceneMessage.addCallback(message, self.clear))
+        if uid not in self.callback_ids:
+            self.callback_ids[uid] = self.add_node_callback(node, partial(self.invalidate, uid))
+                
+    def invalidate(self, uid, *args):
+        self.cache.pop(uid, None)
+        
+    def clear(self, *args):
+        for callback_id in list(self.callback_ids.values()) + self.scene_callback_ids:
+            om.MMessage.removeCallback(callback_id)
+        self.cache = {}
+        self.callback_ids = {}
+        self.scene_callback_ids = []
+        
+
+class TopologyIndex(MeshCache):
+    '''
+    MeshTopology per mesh, dropped as soon as maya reports a topology change
+    so repeated component tools on the same mesh only read it once
+    '''
+    
+    def read(self, dag_path):
+        return read_mesh_topology(dag_path)
+        
+    def add_node_callback(self, node, func):
+        return om.MPolyMessage.addPolyTopologyChangedCallback(node, func)
+        
+
+class CreaseIndex(MeshCache):
+    '''
+    creased edge ids and values per mesh, read from the mesh's own crease data
+    and dropped whenever the mesh is dirtied, so nothing scans creaseSet
+    '''
+    
+    def read(self, dag_path):
+        try:
+            edge_ids, values = om.MFnMesh(dag_path).getCreaseEdges()
+        except RuntimeError:
+            # raised by meshes that were never creased
+            return np.zeros(0, dtype=np.int32), np.zeros(0)
+        edge_ids = np.array(edge_ids, dtype=np.int32)
+        values = np.array(values, dtype=np.float64)
+        order = np.argsort(edge_ids)
+        creased = values[order] > 0
+        return edge_ids[order][creased], values[order][creased]
+        
+    def add_node_callback(self, node, func):
+        return om.MNodeMessage.addNodeDirtyCallback(node, func)
+        
+    def has_creases(self, mesh):
+        return len(self.get(mesh)[0]) > 0
+        
+    def edges(self, mesh):
+        '''
+        creased edges of mesh as a ComponentSet named after mesh
+        '''
+        return ComponentSet(mesh.split('.')[0], 'e', self.get(mesh)[0])
+        
+class EdgeAngleIndex(MeshCache):
+    '''
+    dihedral angle of every edge per mesh, dropped whenever the mesh is
+    dirtied since moving points changes the angles but not the topology
+    '''
+    
+    def read(self, dag_path):
+        fn_mesh = om.MFnMesh(dag_path)
+        points = np.array(fn_mesh.getPoints(om.MSpace.kObject), dtype=np.float64)[:, :3]
+        face_vertex_counts, face_vertices = fn_mesh.getVertices()
+        topology = MESH_TOPOLOGY.get(dag_path.fullPathName())
+        return edge_dihedral_angles(points, face_vertex_counts, face_vertices, topology)
+        
+    def add_node_callback(self, node, func):
+        return om.MNodeMessage.addNodeDirtyCallback(node, func)
+        
+# shared by every component tool, nothing is read or registered until used
+MESH_TOPOLOGY = TopologyIndex()
+MESH_CREASES = CreaseIndex()
+MESH_EDGE_ANGLES = EdgeAngleIndex()
+
+class ComponentSet(object):
+    '''
+    components of one type on one mesh as a sorted, unique int32 index array,
+    set operations stay in numpy and names() hands maya compact ranges like
+    pCube1.e[10:200] instead of one string per component
+    '''
+    
+    def __init__(self, mesh, kind, indices=()):
+        self.mesh = mesh
+        self.kind = kind
+        self.indices = np.unique(np.asarray(indices, dtype=np.int32))
+        
+    @classmethod
+    def from_names(cls, names):
+        '''
+        maya component names, flattened or ranged, as {(mesh, kind): ComponentSet},
+        whole objects get kind None and an empty set, other components are left out
+        '''
+        chunks = {}
+        for name in names:
+            match = COMPONENT_PATTERN.match(name)
+            if match:
+                mesh, kind, first, last = match.groups()
+                last = last if last is not None else first
+                chunks.setdefault((mesh, kind), []).append(np.arange(int(first), int(last) + 1, dtype=np.int32))
+            elif '.' not in name:
+                chunks.setdefault((name, None), [])
+        return dict(((mesh, kind), cls(mesh, kind, np.concatenate(arrays) if arrays else ()))
+                    for (mesh, kind), arrays in chunks.items())
+        
+    def __len__(self):
+        return len(self.indices)
+        
+    def __contains__(self, index):
+        position = np.searchsorted(self.indices, index)
+        return position < len(self.indices) and self.indices[position] == index
+        
+    def __eq__(self, other):
+        if not isinstance(other, ComponentSet):
+            return NotImplemented
+        return (self.mesh, self.kind) == (other.mesh, other.kind) and np.array_equal(self.indices, other.indices)
+        
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+        
+    # compared by content and the index array is mutable, so not hashable
+    __hash__ = None
+        
+    def __repr__(self):
+        return 'ComponentSet({})'.format(' '.join(self.names()))
+        
+    def check(self, other):
+        if (self.mesh, self.kind) != (other.mesh, other.kind):
+            raise ValueError('cannot combine {}.{} with {}.{}'.format(self.mesh, self.kind, other.mesh, other.kind))
+            
+    def copy(self, indices):
+        component_set = ComponentSet(self.mesh, self.kind)
+        component_set.indices = indices.astype(np.int32)
+        return component_set
+        
+    def union(self, other):
+        self.check(other)
+        return self.copy(np.union1d(self.indices, other.indices))
+        
+    def intersection(self, other):
+        self.check(other)
+        return self.copy(np.intersect1d(self.indices, other.indices, assume_unique=True))
+        
+    def difference(self, other):
+        self.check(other)
+        return self.copy(np.setdiff1d(self.indices, other.indices, assume_unique=True))
+        
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+    
+    def ranges(self):
+        '''
+        (first, last) pairs of every run of consecutive indices
+        '''
+        if not len(self.indices):
+            return []
+        breaks = np.flatnonzero(np.diff(self.indices) != 1) + 1
+        firsts = self.indices[np.concatenate([[0], breaks])]
+        lasts = self.indices[np.concatenate([breaks - 1, [len(self.indices) - 1]])]
+        return list(zip(firsts.tolist(), lasts.tolist()))
+        
+    def names(self):
+        names = []
+        for first, last in self.ranges():
+            if first == last:
+                names.append('{}.{}[{}]'.format(self.mesh, self.kind, first))
+            else:
+                names.append('{}.{}[{}:{}]'.format(self.mesh, self.kind, first, last))
+        return names
+        
+def selection_names(component_sets):
+    names = []
+    for component_set in component_sets:
+        names.extend(component_set.names())
+    return names
+
+def edge_sets(ep):
+    '''
+    selection converted to one edge ComponentSet per mesh, ep turns faces into
+    the border of the face selection
+    '''
+    edges = {}
+    for (mesh, kind), components in ComponentSet.from_names(mc.ls(sl=True)).items():
+        try:
+            topology = MESH_TOPOLOGY.get(mesh)
+        except RuntimeError:
+            continue
+        if kind is None:
+            edge_ids = np.arange(topology.num_edges)
+        elif kind == 'map':
+            uv_vertices = read_mesh_uvs(mesh)[0][components.indices]
+            edge_ids = topology.to_edges('vtx', np.unique(uv_vertices[uv_vertices >= 0]))
+        else:
+            edge_ids = topology.to_edges(kind, components.indices, border = ep)
+        edge_set = ComponentSet(mesh, 'e', edge_ids)
+        edges[mesh] = edges[mesh].union(edge_set) if mesh in edges else edge_set
+    return list(edges.values())
+
 def growAlongRing():
-    sel_obj = mc.ls(sl = True, flatten = True)
-    mc.select(sel_obj[0])
-    mc.polySelectSp(ring = True)
-    ring = mc.ls(sl = True, flatten = True)
-    mc.select(sel_obj)
-    mc.select(mc.polyListComponentConversion(tf = True))
-    mc.select(mc.polyListComponentConversion(te = True))
-    growEdges = mc.ls(sl = True, flatten = True)
-    growRings = list(set(growEdges).intersection(set(ring)))
+    growRings = []
+    for (mesh, kind), edges in ComponentSet.from_names(mc.ls(sl = True)).items():
+        if kind != 'e':
+            continue
+        topology = MESH_TOPOLOGY.get(mesh)
+        ring = ComponentSet(mesh, 'e', topology.ring(edges.indices[0]))
+        growRings.extend((ComponentSet(mesh, 'e', topology.grow_ring(edges.indices)) & ring).names())
     mc.select(growRings)
     return growRings
 
 def getloop_or_ring(typ, sel_obj):
-    mc.select(sel_obj)
-    if typ == 'l':
-        mc.polySelectSp(loop = True)
-    else:
-        mc.polySelectSp(ring = True)
-    return mc.ls(sl = True, flatten = True)
+    mesh, kind, index, _ = COMPONENT_PATTERN.match(sel_obj).groups()
+    topology = MESH_TOPOLOGY.get(mesh)
+    edges = topology.loop(int(index)) if typ == 'l' else topology.ring(int(index))
+    edges = ComponentSet(mesh, 'e', edges).names()
+    mc.select(edges)
+    return edges
 
 def growloop_or_ring(typ):
     if typ == 'r':
@@ -2018,132 +3531,677 @@ def growloop_or_ring(typ):
         mel.eval('PolySelectTraverse 5')
 
 def checker_select(op = 'l', spacing = 1):
-    sel_obj = mc.ls(sl=True, flatten = True)
-    check_spacing = False
-    non_edge = False
-    loop_or_ring = []
-    de_sel = []
-    #caculating spacing based on selection
-    if sel_obj:
-        if '.e[' in sel_obj[0]:
-            edge_loop = getloop_or_ring('l', sel_obj[0])
-            edge_ring = getloop_or_ring('r', sel_obj[0])
-            if len(sel_obj) == 2:
-                if sel_obj[-1] in edge_loop:
-                    op = 'l'
-                    check_spacing = True
-                elif sel_obj[-1] in edge_ring:
-                    op = 'r'
-                    check_spacing = True
-            if len(sel_obj) > 2:
-                deledge_loop = list(set(edge_loop) - set(sel_obj))
-                deledge_ring = list(set(edge_ring) - set(sel_obj))
-                if len(deledge_loop) == 2:
-                    op = 'l'
-                    check_spacing = True
-                    de_sel = deledge_loop
-                    sel_obj = de_sel
-                    loop_or_ring = edge_loop
-                elif len(deledge_loop) == 0:
-                    op = 'l'
-                elif len(deledge_ring) == 2:
-                    op = 'r'
-                    de_sel = deledge_ring
-                    sel_obj = de_sel
-                    check_spacing = True
-                    loop_or_ring = edge_ring
-                elif len(deledge_ring) == 0:
-                    op = 'r'
-                else:
-                    return
-                    
-        elif '.f[' in sel_obj[0] or '.vtx[' in sel_obj[0] or '.map[' in sel_obj[0]:
-            non_edge = True
-            op = 'l'
-            for obj in range(2):
-                mc.polySelectSp(loop = True)
-            non_edge_loop = mc.ls(sl = True, flatten = True)   
-            if len(sel_obj) == 2:
-                check_spacing = True
-            if len(sel_obj) > 2:
-                de_sel = list(set(non_edge_loop) - set(sel_obj))
-                if len(de_sel) == 2:
-                    check_spacing = True
-                    sel_obj = de_sel         
-    else:
+    sel_obj = mc.ls(sl=True)
+    if not sel_obj:
         mc.inViewMessage(amg='Nothing selected<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True, fst=5)
         return
     
-    if check_spacing:
-        mc.select(sel_obj[0])
-        for obj in range(50):
-            growloop_or_ring(op)
-            if sel_obj[-1] in mc.ls(sl = True, flatten = True):
-                spacing = obj
-                break
-    spacing = spacing + 1
-    is_edge = True
-    current_obj = sel_obj
-    ordered_obj = []
-    added_obj = []
-    filtered_obj = []
-        
-    if len(sel_obj) == 1:
-        ordered_obj = sel_obj
-        
-    mc.select(sel_obj[0])
-    for i in range(5000):
-
-        index = i+1
-        growloop_or_ring(op)
-        added_obj = mc.ls(sl = True, flatten = True)
-        if non_edge:
-            added_obj = list(set(non_edge_loop).intersection(set(added_obj)))
-        filtered_obj = list(set(added_obj) - set(current_obj))
-        current_obj = added_obj
-        if not filtered_obj:
-            break
-        if index % spacing == 0:
-            ordered_obj.append(filtered_obj[0])
-            if len(filtered_obj) == 2:
-                ordered_obj.append(filtered_obj[1])
+    component_sets = ComponentSet.from_names(sel_obj)
+    if len(component_sets) != 1 or list(component_sets)[0][1] is None:
+        mc.warning('select edges, faces, vertices or uvs on one mesh')
+        return
+    components = list(component_sets.values())[0]
+    topology = MESH_TOPOLOGY.get(components.mesh)
+    
+    if components.kind == 'map':
+        # walk the vertex loop under the uvs, then back to the uvs of the
+        # selected shells so the other side of a seam is left alone
+        uv_vertices, uv_shells = read_mesh_uvs(components.mesh)
+        vertices = uv_vertices[components.indices]
+        pattern = checker_components(topology, 'vtx', np.unique(vertices[vertices >= 0]).tolist(), op, spacing)
+        if pattern is None:
+            return
+        uvs = np.nonzero(np.isin(uv_vertices, pattern) & np.isin(uv_shells, uv_shells[components.indices]))[0]
+        mc.select(ComponentSet(components.mesh, 'map', uvs).names())
+        return
+        
+    pattern = checker_components(topology, components.kind, components.indices.tolist(), op, spacing)
+    if pattern is None:
+        return
+    mc.select(ComponentSet(components.mesh, components.kind, pattern).names())
+
+ColorSpaceRule = namedtuple('ColorSpaceRule', ['pattern', 'color_space'])
+
+# default targets in order of preference, the first one the config has wins
+DEFAULT_COLOR_SPACES = {
+    'color': ['Utility - sRGB - Texture', 'sRGB Encoded Rec.709 (sRGB)', 'sRGB'],
+    'data': ['Utility - Raw', 'Raw'],
+}
+
+def default_color_space_rules(color_spaces):
+    '''
+    (pattern, color space) for each texture channel, matched as a whole token,
+    channels whose preferred color spaces are all missing from color_spaces
+    get no rule
+    '''
+    valid = set(color_spaces)
+    targets = {}
+    for kind, preferred in DEFAULT_COLOR_SPACES.items():
+        targets[kind] = next((color_space for color_space in preferred if color_space in valid), None)
+    rules = []
+    for tokens in TEXTURE_CHANNELS:
+        color_space = targets['color' if tokens[0] in COLOR_CHANNELS else 'data']
+        if color_space:
+            rules.append((r'(?:^|[._-])(?:{})(?:[._-]|$)'.format('|'.join(tokens)), color_space))
+    return rules
+
+def load_color_space_rules(color_spaces, rules_file=agt_color_space_rules):
+    '''
+    rules from rules_file ([[pattern, color space], ...]) ahead of the channel
+    defaults, first match wins. rules naming a color space outside
+    color_spaces are dropped
+    '''
+    valid = set(color_spaces)
+    rules = []
+    if os.path.isfile(rules_file):
+        with open(rules_file, 'r') as f:
+            for pattern, color_space in json.load(f):
+                if color_space in valid:
+                    rules.append(ColorSpaceRule(re.compile(pattern, re.IGNORECASE), color_space))
+                else:
+                    om.MGlobal.displayWarning('skipped color space rule {}, {} is not available'.format(pattern, color_space))
+    for pattern, color_space in default_color_space_rules(color_spaces):
+        rules.append(ColorSpaceRule(re.compile(pattern, re.IGNORECASE), color_space))
+    return rules
+
+def match_color_space(rules, node, path):
+    '''
+    color space of the first rule matching the file name or the node name
+    (without namespace), None when nothing matches
+    '''
+    file_name = os.path.basename(path.replace('\\', '/'))
+    name = node.split(':')[-1]
+    for rule in rules:
+        if rule.pattern.search(file_name) or rule.pattern.search(name):
+            return rule.color_space
+    return None
+
+def color_space_scope(scope='selection'):
+    '''
+    file nodes of the whole scene, or of the selection and everything upstream
+    of it (select a shader or shading group to get its textures)
+    '''
+    if scope == 'scene':
+        return mc.ls(type='file')
+    selection = mc.ls(sl=True)
+    if not selection:
+        return []
+    return sorted(set(mc.ls(selection + (mc.listHistory(selection) or []), type='file')))
+
+def read_file_color_spaces(nodes):
+    '''
+    (texture path, color space, writable) per file node through the api, no
+    command per node. colorSpace is not writable when locked or connected
+    '''
+    sel = om.MSelectionList()
+    for node in nodes:
+        sel.add(node)
+    result = []
+    for i in range(sel.length()):
+        fn = om.MFnDependencyNode(sel.getDependNode(i))
+        plug = fn.findPlug('colorSpace', False)
+        result.append((
+            fn.findPlug('fileTextureName', False).asString(), plug.asString(),
+            not (plug.isLocked or plug.isDestination)))
+    return result
+
+def apply_color_spaces(nodes, color_space=None, rules=None):
+    '''
+    color_space for every node, or the matching rule per node. nodes already
+    in their color space are left alone, nodes whose colorSpace is locked or
+    connected are skipped and the others are written with one mel call in
+    one undo chunk
+    returns ([(node, color space)] changed, number of nodes matched,
+             [node] skipped)
+    '''
+    changes = []
+    skipped = []
+    matched = 0
+    for node, (path, current, writable) in zip(nodes, read_file_color_spaces(nodes)):
+        target = color_space or match_color_space(rules, node, path)
+        if target is None:
+            continue
+        matched += 1
+        if target == current:
+            continue
+        if writable:
+            changes.append((node, target))
         else:
+            skipped.append(node)
+    if changes:
+        mc.undoInfo(openChunk=True)
+        try:
+            mel.eval(''.join(
+                'setAttr -type "string" "{}.colorSpace" "{}";'.format(node, target.replace('"', '\\"'))
+                for node, target in changes))
+        finally:
+            mc.undoInfo(closeChunk=True)
+    return changes, matched, skipped
+
+def report_skipped_color_spaces(skipped):
+    if skipped:
+        om.MGlobal.displayWarning('skipped {} file nodes with a locked or connected colorSpace: {}'.format(
+            len(skipped), ', '.join(skipped[:10]) + (' ...' if len(skipped) > 10 else '')))
+
+def set_color_space(color_space, scope='selection'):
+    
+    nodes = color_space_scope(scope)
+    if not nodes:
+        mc.inViewMessage(amg='Selecte file nodes<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True, fst=5)
+        mc.warning('Selecte file nodes')
+        return
+    changes, matched, skipped = apply_color_spaces(nodes, color_space=color_space)
+    report_skipped_color_spaces(skipped)
+    om.MGlobal.displayInfo('set {} of {} file nodes to {}'.format(len(changes), matched, color_space))
+    
+def apply_color_space_rules(scope='scene', rules=None):
+    '''
+    run the color space rules over the file nodes in scope
+    '''
+    nodes = color_space_scope(scope)
+    if not nodes:
+        mc.inViewMessage(amg='No file nodes<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True, fst=5)
+        return
+    if rules is None:
+        rules = load_color_space_rules(get_filtered_color_spaces())
+    changes, matched, skipped = apply_color_spaces(nodes, rules=rules)
+    report_skipped_color_spaces(skipped)
+    om.MGlobal.displayInfo('color space rules changed {} file nodes, {} matched, {} in {}'.format(
+        len(changes), matched, len(nodes), scope))
+
+# attributes maya connects from place2dTexture to file, same name on both ends
+PLACE2D_FILE_ATTRIBUTES = [
+    'coverage', 'translateFrame', 'rotateFrame', 'mirrorU', 'mirrorV', 'stagger',
+    'wrapU', 'wrapV', 'repeatUV', 'offset', 'rotateUV', 'noiseUV',
+    'vertexUvOne', 'vertexUvTwo', 'vertexUvThree', 'vertexCameraOne',
+]
+PLACE2D_FILE_CONNECTIONS = [(attr, attr) for attr in PLACE2D_FILE_ATTRIBUTES] + [
+    ('outUV', 'uvCoord'),
+    ('outUvFilterSize', 'uvFilterSize'),
+]
+
+class FileNetwork(object):
+    '''
+    file nodes sharing one place2dTexture described as data (nodes, attribute
+    values, connections) and built in one undo chunk with a single node
+    editor update at the end
+    
+    place2d : an existing place2dTexture to share, a new one is made otherwise
+    '''
+    
+    def __init__(self, place2d=None):
+        self.nodes = []
+        self.attributes = []
+        self.connections = []
+        self.assignments = []
+        self.existing = {}
+        if place2d:
+            self.existing[place2d] = place2d
+            self.place2d = place2d
+        else:
+            self.place2d = self.add_node('place2dTexture', 'place2dTexture1', 'asUtility')
+            
+    def add_node(self, node_type, name, category):
+        key = '{}#{}'.format(node_type, len(self.nodes))
+        self.nodes.append((key, node_type, name, category))
+        return key
+        
+    def set_attr(self, key, attr, value, value_type=None):
+        self.attributes.append((key, attr, value, value_type))
+        
+    def connect(self, src_key, src_attr, dst_key, dst_attr):
+        self.connections.append((src_key, src_attr, dst_key, dst_attr))
+        
+    def add_file(self, name='file1', path='', color_space='sRGB', udim=False):
+        key = self.add_node('file', name, 'asTexture')
+        for src_attr, dst_attr in PLACE2D_FILE_CONNECTIONS:
+            self.connect(self.place2d, src_attr, key, dst_attr)
+        self.set_attr(key, 'colorSpace', color_space, 'string')
+        if path:
+            self.set_attr(key, 'fileTextureName', path, 'string')
+        if udim:
+            self.set_attr(key, 'uvTilingMode', 3)
+        return key
+        
+    def link_repeat_uv(self):
+        self.connect(self.place2d, 'repeatU', self.place2d, 'repeatV')
+        
+    def assign(self, key, members):
+        self.assignments.append((key, members))
+        
+    def plan(self):
+        '''
+        the graph with requested names as plain data, nothing is created so
+        it works without maya (dry run), maya may still rename on clashes
+        '''
+        names = dict(self.existing)
+        names.update((key, name) for key, node_type, name, category in self.nodes)
+        return {
+            'nodes': [(names[key], node_type) for key, node_type, name, category in self.nodes],
+            'attributes': [('{}.{}'.format(names[key], attr), value) for key, attr, value, value_type in self.attributes],
+            'connections': [
+                ('{}.{}'.format(names[src_key], src_attr), '{}.{}'.format(names[dst_key], dst_attr))
+                for src_key, src_attr, dst_key, dst_attr in self.connections],
+            'assignments': [(names[key], members) for key, members in self.assignments],
+        }
+        
+    def build(self, add_to_node_editor=True):
+        '''
+        create everything, returns {key: node name}. if any command fails the
+        chunk is closed and undone so no half built network stays behind
+        '''
+        mc.undoInfo(openChunk=True)
+        built = False
+        try:
+            names = self.run_commands()
+            if add_to_node_editor:
+                mc.select(list(names.values()))
+                mel.eval('NodeEditorGraphAddSelected;')
+            mc.select(names[self.place2d])
+            built = True
+        finally:
+            mc.undoInfo(closeChunk=True)
+            if not built and mc.undoInfo(q=True, state=True):
+                mc.undo()
+        return names
+        
+    def run_commands(self):
+        names = dict(self.existing)
+        for key, node_type, name, category in self.nodes:
+            if category == 'shadingGroup':
+                names[key] = mc.sets(name=name, renderable=True, noSurfaceShader=True, empty=True)
+            else:
+                names[key] = mc.shadingNode(node_type, name=name, skipSelect=True, **{category: True})
+        for key, attr, value, value_type in self.attributes:
+            plug = '{}.{}'.format(names[key], attr)
+            if value_type:
+                mc.setAttr(plug, value, type=value_type)
+            else:
+                mc.setAttr(plug, value)
+        for src_key, src_attr, dst_key, dst_attr in self.connections:
+            mc.connectAttr('{}.{}'.format(names[src_key], src_attr), '{}.{}'.format(names[dst_key], dst_attr), f=True)
+        # one forceElement per shading group whatever the number of members
+        for key, members in self.assignments:
+            mc.sets(members, e=True, forceElement=names[key])
+        return names
+        
+    def add_texture(self, name, texture, aces=False, color_space=None):
+        '''
+        color_space : overrides the guessed color space of color channels
+        '''
+        if not (color_space and texture.channel in COLOR_CHANNELS):
+            color_space = guess_color_space(texture.channel, aces)
+        return self.add_file(
+            name=name, path=texture.path, color_space=color_space,
+            udim=bool(texture.tiles) or '<UDIM>' in texture.path)
+            
+    def file_nodes(self, names):
+        return [names[key] for key, node_type, name, category in self.nodes if node_type == 'file']
+        
+TEXTURE_EXTENSIONS = ['.exr', '.tif', '.tiff', '.png', '.tga', '.jpg', '.jpeg', '.hdr', '.bmp']
+# the first token of each channel is its canonical name
+TEXTURE_CHANNELS = [
+    ['basecolor', 'base_color', 'albedo', 'diffuse', 'diff', 'color', 'col'],
+    ['roughness', 'rough', 'rgh'],
+    ['metalness', 'metallic', 'metal'],
+    ['normal', 'normalgl', 'normaldx', 'nrm', 'nor'],
+    ['height', 'displacement', 'disp'],
+    ['bump'],
+    ['opacity', 'alpha', 'mask'],
+    ['emission', 'emissive'],
+    ['ao', 'ambientocclusion', 'occlusion'],
+    ['specular', 'spec'],
+    ['glossiness', 'gloss'],
+]
+COLOR_CHANNELS = set(['basecolor', 'emission'])
+CHANNEL_NAMES = dict((token, tokens[0]) for tokens in TEXTURE_CHANNELS for token in tokens)
+TEXTURE_FILE_PATTERN = re.compile(
+    r'^(?P<stem>.+?)(?:(?P<separator>[._])(?P<udim><UDIM>|10(?:0[1-9]|[1-9]\d)))?(?P<ext>\.[^.]+)$', re.IGNORECASE)
+# the channel ends the name, optionally followed by a resolution like _2k or _1024
+CHANNEL_PATTERN = re.compile(
+    r'(?:^|[._-])(?P<channel>{})(?:[._-]\d+k?)?$'.format('|'.join(sorted(CHANNEL_NAMES, key=len, reverse=True))), re.IGNORECASE)
+
+TextureFile = namedtuple('TextureFile', ['texture_set', 'channel', 'path', 'tiles'])
+
+# directory -> (mtime, texture file names, sub directories)
+TEXTURE_DIR_CACHE = {}
+
+def scan_texture_dir(folder, recursive=False):
+    '''
+    yield (directory, texture file names) with os.scandir, a directory is
+    only listed again when its mtime changed so re-ingesting a library only
+    pays for the folders that gained or lost files
+    '''
+    stack = [os.path.normpath(folder)]
+    while stack:
+        directory = stack.pop()
+        try:
+            mtime = os.stat(directory).st_mtime
+        except OSError:
+            continue
+        cached = TEXTURE_DIR_CACHE.get(directory)
+        if cached is None or cached[0] != mtime:
+            files = []
+            sub_dirs = []
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    # symlinked folders are not followed, a link loop would never end
+                    if entry.is_dir(follow_symlinks=False):
+                        sub_dirs.append(entry.path)
+                    elif os.path.splitext(entry.name)[1].lower() in TEXTURE_EXTENSIONS:
+                        files.append(entry.name)
+            cached = (mtime, files, sub_dirs)
+            TEXTURE_DIR_CACHE[directory] = cached
+        yield directory, cached[1]
+        if recursive:
+            stack.extend(cached[2])
+
+def group_textures(listing):
+    '''
+    TextureFile per texture set and channel from (directory, file names),
+    udim tiles collapse into one <UDIM> path, files without a known channel
+    token are left out and the first extension in TEXTURE_EXTENSIONS wins.
+    a tile number only counts when the name has a <UDIM> token, tile 1001
+    or several tiles share the stem, so name_1024.png stays a single file
+    '''
+    entries = []
+    udim_tiles = {}
+    for directory, file_names in listing:
+        for file_name in file_names:
+            match = TEXTURE_FILE_PATTERN.match(file_name)
+            if not match:
+                continue
+            stem, separator, udim, ext = match.group('stem', 'separator', 'udim', 'ext')
+            if udim:
+                udim_tiles.setdefault((directory, stem, separator, ext), set()).add(udim.upper())
+            entries.append((directory, file_name, stem, separator, udim, ext))
+            
+    textures = {}
+    for directory, file_name, stem, separator, udim, ext in entries:
+        if udim:
+            tiles = udim_tiles[(directory, stem, separator, ext)]
+            if len(tiles) == 1 and not tiles & set(['<UDIM>', '1001']):
+                stem, udim = os.path.splitext(file_name)[0], None
+        channel_match = CHANNEL_PATTERN.search(stem)
+        if not channel_match:
             continue
-        ordered_obj.append(sel_obj[0])        
-    if de_sel and non_edge:
-        ordered_obj = list(set(non_edge_loop) - set(ordered_obj))
-    if de_sel and loop_or_ring:
-        ordered_obj = list(set(loop_or_ring) - set(ordered_obj))
+        texture_set = stem[:channel_match.start()] or os.path.basename(directory)
+        channel = CHANNEL_NAMES[channel_match.group('channel').lower()]
+        key = (directory, texture_set, channel)
         
-    mc.select(ordered_obj)
+        if udim:
+            path = os.path.join(directory, '{}{}<UDIM>{}'.format(stem, separator, ext))
+        else:
+            path = os.path.join(directory, file_name)
+        path = path.replace('\\', '/')
+        texture = textures.get(key)
+        if texture is not None and texture.path != path:
+            if TEXTURE_EXTENSIONS.index(ext.lower()) >= TEXTURE_EXTENSIONS.index(os.path.splitext(texture.path)[1].lower()):
+                continue
+            texture = None
+        if texture is None:
+            texture = TextureFile(texture_set, channel, path, [])
+            textures[key] = texture
+        if udim and udim.isdigit():
+            texture.tiles.append(int(udim))
+    for texture in textures.values():
+        texture.tiles.sort()
+    return [textures[key] for key in sorted(textures)]
 
-def set_color_space(color_space):
+def texture_node_name(*parts):
+    return '_'.join(parts).translate(NameFormatter.TRANSLATE_TABLE).strip('_')
+
+def guess_color_space(channel, aces=False):
+    if channel in COLOR_CHANNELS:
+        return 'Utility - sRGB - Texture' if aces else 'sRGB'
+    return 'Utility - Raw' if aces else 'Raw'
+
+def ingest_textures(folder, recursive=False, aces=False, place2d=None, link_repeat_uv=True):
+    '''
+    file nodes for every texture found under folder, built as one FileNetwork,
+    returns [(TextureFile, file node)]
+    '''
+    textures = group_textures(scan_texture_dir(folder, recursive))
+    if not textures:
+        return []
+    network = FileNetwork(place2d)
+    keys = []
+    for texture in textures:
+        keys.append(network.add_texture(texture_node_name(texture.texture_set, texture.channel), texture, aces))
+    if link_repeat_uv:
+        network.link_repeat_uv()
+    names = network.build()
+    return [(texture, names[key]) for texture, key in zip(textures, keys)]
+
+shader_template_dir = '{}/shader_templates'.format(settings_dir)
+
+SHADER_RENDERERS = {'Maya Defualt': 'maya', 'Arnold': 'arnold', 'V-Ray': 'vray', 'Redshift': 'redshift'}
+
+DISPLACEMENT_SLOT = {
+    'output': 'outAlpha', 'input': 'displacementShader', 'target': 'shading_group', 'alpha_is_luminance': True,
+    'via': {'type': 'displacementShader', 'category': 'asShader', 'input': 'displacement', 'output': 'displacement'},
+}
+
+# one template per renderer, shader_templates/<renderer>.json overrides the
+# keys it defines. "plugin" names the plugin providing the node types. a slot wires a texture channel into the shader (or the
+# shading group with "target"), optionally through a "via" node, and the
+# color correct node goes between file and slot when "color_correct" is set
+SHADER_TEMPLATES = {
+    'maya': {
+        'shader': 'standardSurface',
+        'output': 'outColor',
+        'required': ['basecolor'],
+        'color_correct': {'type': 'colorCorrect', 'input': 'inColor', 'output': 'outColor'},
+        'slots': {
+            'basecolor': {'output': 'outColor', 'input': 'baseColor', 'color_correct': True},
+            'roughness': {'output': 'outAlpha', 'input': 'specularRoughness', 'alpha_is_luminance': True},
+            'metalness': {'output': 'outAlpha', 'input': 'metalness', 'alpha_is_luminance': True},
+            'normal': {
+                'output': 'outAlpha', 'input': 'normalCamera',
+                'via': {'type': 'bump2d', 'input': 'bumpValue', 'output': 'outNormal', 'attributes': {'bumpInterp': 1}}},
+            'height': DISPLACEMENT_SLOT,
+            'opacity': {'output': 'outColor', 'input': 'opacity'},
+            'emission': {'output': 'outColor', 'input': 'emissionColor', 'shader_attributes': {'emission': 1}},
+        },
+    },
+    'arnold': {
+        'shader': 'aiStandardSurface',
+        'plugin': 'mtoa',
+        'output': 'outColor',
+        'required': ['basecolor'],
+        'color_correct': {'type': 'aiColorCorrect', 'input': 'input', 'output': 'outColor'},
+        'slots': {
+            'basecolor': {'output': 'outColor', 'input': 'baseColor', 'color_correct': True},
+            'roughness': {'output': 'outAlpha', 'input': 'specularRoughness', 'alpha_is_luminance': True},
+            'metalness': {'output': 'outAlpha', 'input': 'metalness', 'alpha_is_luminance': True},
+            'normal': {
+                'output': 'outColor', 'input': 'normalCamera',
+                'via': {'type': 'aiNormalMap', 'input': 'input', 'output': 'outValue'}},
+            'height': DISPLACEMENT_SLOT,
+            'opacity': {'output': 'outColor', 'input': 'opacity'},
+            'emission': {'output': 'outColor', 'input': 'emissionColor', 'shader_attributes': {'emission': 1}},
+        },
+    },
+    'vray': {
+        'shader': 'VRayMtl',
+        'plugin': 'vrayformaya',
+        'output': 'outColor',
+        'required': ['basecolor'],
+        'color_correct': {'type': 'colorCorrect', 'input': 'inColor', 'output': 'outColor'},
+        'slots': {
+            'basecolor': {'output': 'outColor', 'input': 'color', 'color_correct': True},
+            'roughness': {
+                'output': 'outAlpha', 'input': 'reflectionGlossiness', 'alpha_is_luminance': True,
+                'shader_attributes': {'useRoughness': 1}},
+            'metalness': {'output': 'outAlpha', 'input': 'metalness', 'alpha_is_luminance': True},
+            'normal': {'output': 'outColor', 'input': 'bumpMap', 'shader_attributes': {'bumpMapType': 1}},
+            'height': DISPLACEMENT_SLOT,
+            'opacity': {'output': 'outColor', 'input': 'opacityMap'},
+            'emission': {'output': 'outColor', 'input': 'illumColor'},
+        },
+    },
+    'redshift': {
+        'shader': 'RedshiftStandardMaterial',
+        'plugin': 'redshift4maya',
+        'output': 'outColor',
+        'required': ['basecolor'],
+        'color_correct': {'type': 'RedshiftColorCorrection', 'input': 'input', 'output': 'outColor'},
+        'slots': {
+            'basecolor': {'output': 'outColor', 'input': 'base_color', 'color_correct': True},
+            'roughness': {'output': 'outAlpha', 'input': 'refl_roughness', 'alpha_is_luminance': True},
+            'metalness': {'output': 'outAlpha', 'input': 'metalness', 'alpha_is_luminance': True},
+            'normal': {
+                'output': 'outColor', 'input': 'bump_input',
+                'via': {'type': 'RedshiftBumpMap', 'input': 'input', 'output': 'out', 'attributes': {'inputType': 1}}},
+            'height': {
+                'output': 'outColor', 'input': 'displacementShader', 'target': 'shading_group',
+                'via': {'type': 'RedshiftDisplacement', 'input': 'texMap', 'output': 'out'}},
+            'opacity': {'output': 'outColor', 'input': 'opacity_color'},
+            'emission': {'output': 'outColor', 'input': 'emission_color', 'shader_attributes': {'emission_weight': 1}},
+        },
+    },
+}
+
+def load_shader_template(renderer, template_dir=shader_template_dir):
+    '''
+    template for a renderer key or combo box label, the json file of the same
+    name in template_dir overrides the built in one key by key
+    '''
+    renderer = SHADER_RENDERERS.get(renderer, renderer)
+    # round trip so edits to the returned template never leak into the defaults
+    template = json.loads(json.dumps(SHADER_TEMPLATES.get(renderer, {})))
+    template_file = '{}/{}.json'.format(template_dir, renderer)
+    if os.path.isfile(template_file):
+        with open(template_file, 'r') as f:
+            template.update(json.load(f))
+    if 'shader' not in template:
+        raise ValueError('no shader template for {}'.format(renderer))
+    return template
+
+class ShaderNetwork(FileNetwork):
+    '''
+    materials (shader, shading group, file nodes and the nodes in between)
+    described by a renderer template, all sharing one place2dTexture
+    '''
+    
+    def __init__(self, template, place2d=None):
+        super(ShaderNetwork, self).__init__(place2d)
+        self.template = template
+        
+    def add_material(self, name, textures, color_correct=False, aces=False, color_space=None):
+        '''
+        textures : {channel: TextureFile}, channels without a slot are ignored
+        color_space : color space of the color channels, guessed when empty
+        returns the shading group key
+        '''
+        template = self.template
+        shader = self.add_node(template['shader'], name, 'asShader')
+        shading_group = self.add_node('shadingEngine', '{}SG'.format(name), 'shadingGroup')
+        self.connect(shader, template.get('output', 'outColor'), shading_group, 'surfaceShader')
+        for channel, slot in sorted(template['slots'].items()):
+            texture = textures.get(channel)
+            if texture is None:
+                continue
+            source = self.add_texture(texture_node_name(name, channel), texture, aces, color_space)
+            source_attr = slot['output']
+            if slot.get('alpha_is_luminance'):
+                self.set_attr(source, 'alphaIsLuminance', 1)
+                
+            correction = template.get('color_correct')
+            if color_correct and correction and slot.get('color_correct'):
+                node = self.add_node(correction['type'], texture_node_name(name, channel, 'cc'), 'asUtility')
+                self.connect(source, source_attr, node, correction['input'])
+                source, source_attr = node, correction['output']
+            via = slot.get('via')
+            if via:
+                node = self.add_node(via['type'], texture_node_name(name, channel, via['type']), via.get('category', 'asUtility'))
+                for attr, value in sorted(via.get('attributes', {}).items()):
+                    self.set_attr(node, attr, value)
+                self.connect(source, source_attr, node, via['input'])
+                source, source_attr = node, via['output']
+                
+            target = shading_group if slot.get('target') == 'shading_group' else shader
+            self.connect(source, source_attr, target, slot['input'])
+            for attr, value in sorted(slot.get('shader_attributes', {}).items()):
+                self.set_attr(shader, attr, value)
+        return shading_group
+        
+def generate_shaders(textures, renderer='arnold', name=None, color_correct=False, aces=False,
+                     color_space=None, assign=None, place2d=None, link_repeat_uv=True, dry_run=False):
+    '''
+    one material per texture set, built in one batch
     
-    sel_file = mc.ls(sl=True, type='file')
-    if sel_file:
-        for file in sel_file:
-            mc.setAttr(file+'.colorSpace', color_space, type='string')
-        print('set color space to '+color_space)
+    textures : TextureFile list, see group_textures
+    name : material name, the texture set name when empty, suffixed with the
+           texture set when there is more than one material
+    color_space : color space of color channels (base color, emission), data
+                  channels always get the raw color space
+    assign : objects to assign, a single material takes all of them, several
+             materials take the objects whose name contains their texture set
+    dry_run : return the planned graph (see FileNetwork.plan) instead of
+              building it
+    returns (texture set, shading group) pairs and the graph or node names
+    '''
+    template = load_shader_template(renderer)
+    required = template.get('required', [])
+    texture_sets = {}
+    for texture in textures:
+        texture_sets.setdefault(texture.texture_set, {})[texture.channel] = texture
+    texture_sets = [
+        (texture_set, channels) for texture_set, channels in sorted(texture_sets.items())
+        if all(channel in channels for channel in required)]
+    if not texture_sets:
+        return [], {}
+        
+    network = ShaderNetwork(template, place2d)
+    materials = []
+    for texture_set, channels in texture_sets:
+        if not name:
+            material_name = texture_node_name(texture_set)
+        elif len(texture_sets) > 1:
+            material_name = texture_node_name(name, texture_set)
+        else:
+            material_name = texture_node_name(name)
+        materials.append((texture_set, network.add_material(material_name, channels, color_correct, aces, color_space)))
+    if link_repeat_uv:
+        network.link_repeat_uv()
+        
+    if assign:
+        for texture_set, shading_group in materials:
+            if len(materials) == 1:
+                members = list(assign)
+            else:
+                members = [obj for obj in assign if texture_set.lower() in obj.split('|')[-1].lower()]
+            if members:
+                network.assign(shading_group, members)
+                
+    if dry_run:
+        graph = network.plan()
+        names = dict(network.existing)
+        names.update((key, node_name) for key, node_type, node_name, category in network.nodes)
     else:
-        mc.inViewMessage(amg='Selecte file nodes<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True, fst=5)
-        mc.warning('Selecte file nodes')
+        check_node_types(network, template.get('plugin'))
+        graph = names = network.build(add_to_node_editor=False)
+    return [(texture_set, names[shading_group]) for texture_set, shading_group in materials], graph
+
+def check_node_types(network, plugin=None):
+    '''
+    raise RuntimeError before anything is built when a node type of the
+    network is unknown to maya, naming the plugin to load
+    '''
+    known = set(mc.ls(nodeTypes=True))
+    missing = sorted(set(node_type for key, node_type, name, category in network.nodes
+                         if category != 'shadingGroup' and node_type not in known))
+    if missing:
+        if plugin and not mc.pluginInfo(plugin, q=True, loaded=True):
+            raise RuntimeError('load the {} plugin first, {} is not available'.format(plugin, ', '.join(missing)))
+        raise RuntimeError('unknown node types {}'.format(', '.join(missing)))
 
 def file_generator():
-    
     sel_tile = mc.ls(sl=True, type='place2dTexture')
-    if sel_tile:
-        tile = sel_tile[0]
-    else:
-        tile = mc.shadingNode('place2dTexture', asUtility=True)
-    file = mc.createNode('file')
-    
-    #connecting repeator and file node
-    connect_tweaker_to_file(tile, file)
-    file_nodetree = [tile, file]
-    mc.select(file_nodetree)
-    mel.eval('NodeEditorGraphAddSelected;')
-    mc.select(tile)
-    return file
+    network = FileNetwork(sel_tile[0] if sel_tile else None)
+    network.add_file()
+    return network.file_nodes(network.build())[0]
 
 def insert_color_adjustment(color_adjustment):
     
@@ -2254,19 +4312,26 @@ def reset_color():
     for obj in sel_obj:
         mc.setAttr('{}.useOutlinerColor'.format(obj), False)
         
+def hard_edge_sets(edge_sets, low_angle, high_angle, angles=None):
+    '''
+    the edges of each set whose dihedral angle is within low and high, angles
+    can hold already looked up per-set angle arrays so only the mask is redone
+    '''
+    if angles is None:
+        angles = [MESH_EDGE_ANGLES.get(edges.mesh)[edges.indices] for edges in edge_sets]
+    hard_edges = []
+    for edges, edge_angles in zip(edge_sets, angles):
+        with np.errstate(invalid='ignore'):
+            mask = (edge_angles >= low_angle) & (edge_angles <= high_angle)
+        hard_edges.append(edges.copy(edges.indices[mask]))
+    return hard_edges
+
 def select_hard_edges(low_angle, high_angle):
     
     mc.undoInfo(openChunk=True)
     sel_obj = mc.ls(sl=True)
-    filtered_edge = []
     if sel_obj:
-        selEdge = mc.polyListComponentConversion(toEdge=True)
-        mc.select(selEdge)
-        preserved_edge = mc.ls(sl=True, flatten=True)
-        mc.polySelectConstraint(m=3 , t=0x8000, a=True, ab=(low_angle, high_angle))
-        mc.polySelectConstraint(m=0)
-        allHE = mc.ls(sl = True, flatten=True)
-        filtered_edge = list(set(allHE).intersection(set(preserved_edge)))
+        filtered_edge = selection_names(hard_edge_sets(edge_sets(False), low_angle, high_angle))
         mc.select(sel_obj)
         mel.eval('setSelectMode components Components; selectType -smp 0 -sme 1 -smf 0 -smu 0 -pv 0 -pe 1 -pf 0 -puv 0; HideManipulators; ')
         mc.select(filtered_edge, r=True)
@@ -2274,6 +4339,49 @@ def select_hard_edges(low_angle, high_angle):
         mc.inViewMessage(amg='Nothing selected<font color="#fdca3b"></font><br>.', pos='topCenter', fade=True)
     mc.undoInfo(closeChunk=True)
     
+class HardEdgePreview(object):
+    '''
+    live hard edge selection while an angle slider is dragged, the edges and
+    their angles are looked up once when the drag starts and every slider
+    move only redoes the threshold mask and one select. the drag is one undo
+    chunk, stop closes it and is safe to call any time the drag may have been
+    cut short (release, preview turned off, window hidden, failed update)
+    '''
+    
+    def __init__(self):
+        self.edge_sets = []
+        self.angles = []
+        self.selected = []
+        self.active = False
+        
+    def start(self):
+        self.stop()
+        sel_obj = mc.ls(sl=True)
+        if not sel_obj:
+            return
+        # dragging again right after a preview keeps the edges it started from
+        if sel_obj != self.selected:
+            self.edge_sets = edge_sets(False)
+            self.angles = [MESH_EDGE_ANGLES.get(edges.mesh)[edges.indices] for edges in self.edge_sets]
+        mc.undoInfo(openChunk=True)
+        mel.eval('setSelectMode components Components; selectType -smp 0 -sme 1 -smf 0 -smu 0 -pv 0 -pe 1 -pf 0 -puv 0; HideManipulators; ')
+        self.active = True
+        
+    def update(self, low_angle, high_angle):
+        if self.active:
+            try:
+                mc.select(selection_names(hard_edge_sets(self.edge_sets, low_angle, high_angle, self.angles)), r=True)
+            except RuntimeError:
+                # the meshes went away mid drag
+                self.stop()
+                raise
+            self.selected = mc.ls(sl=True)
+            
+    def stop(self):
+        if self.active:
+            self.active = False
+            mc.undoInfo(closeChunk=True)
+            
     
 def get_true_object_type(sel_obj):
     true_type = ''
@@ -2301,3 +4409,7 @@ def get_true_object_type(sel_obj):
         true_type = ''
     
     return true_type
+
+
+if __name__ == '__main__':
+    display()
@@ -0,0 +1,127 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agt_core import MeshTopology, checker_components, gather
+
+
+def grid(columns, rows):
+    '''
+    quad grid faces, vertex j * (columns + 1) + i sits at column i, row j
+    '''
+    vertex = lambda i, j: j * (columns + 1) + i
+    return [[vertex(i, j), vertex(i + 1, j), vertex(i + 1, j + 1), vertex(i, j + 1)]
+            for j in range(rows) for i in range(columns)]
+
+
+def cylinder(sides, rows):
+    '''
+    open quad tube, vertex j * sides + i sits at side i, row j
+    '''
+    vertex = lambda i, j: j * sides + i % sides
+    return [[vertex(i, j), vertex(i + 1, j), vertex(i + 1, j + 1), vertex(i, j + 1)]
+            for j in range(rows) for i in range(sides)]
+
+
+def edge_rows(topology, edges, row_size):
+    return set(tuple(sorted(vertex // row_size for vertex in topology.edge_vertices[edge])) for edge in edges)
+
+
+def members(walk):
+    forward, backward, closed = walk
+    return set(forward + backward)
+
+
+def test_counts():
+    topology = MeshTopology.from_faces(grid(4, 3))
+    assert (topology.num_faces, topology.num_vertices, topology.num_edges) == (12, 20, 31)
+    topology = MeshTopology.from_faces(cylinder(8, 3))
+    assert (topology.num_faces, topology.num_vertices, topology.num_edges) == (24, 32, 56)
+
+
+def test_grid_loop_and_ring():
+    topology = MeshTopology.from_faces(grid(4, 3))
+    edge = 0  # first edge of face 0, from vertex 0 to 1 along the bottom row
+    assert sorted(topology.edge_vertices[edge]) == [0, 1]
+    loop = topology.loop(edge)
+    assert len(loop) == 4
+    assert edge_rows(topology, loop, 5) == set([(0, 0)])
+    assert topology.edge_loop(edge)[2] is False
+    ring = topology.ring(edge)
+    assert len(ring) == 4
+    assert edge_rows(topology, ring, 5) == set([(0, 0), (1, 1), (2, 2), (3, 3)])
+
+
+def test_cylinder_loop_is_closed():
+    topology = MeshTopology.from_faces(cylinder(8, 3))
+    edge = [int(edge) for edge in topology.face_edges(8) if edge_rows(topology, [edge], 8) == set([(1, 1)])][0]
+    walk = topology.edge_loop(edge)
+    assert walk[2] is True
+    assert len(topology.loop(edge)) == 8
+    assert edge_rows(topology, topology.loop(edge), 8) == set([(1, 1)])
+    assert len(topology.ring(edge)) == 4
+    vertex_walk = topology.vertex_loop(int(topology.edge_vertices[edge][0]), edge)
+    assert vertex_walk[2] is True
+    assert len(members(vertex_walk)) == 7
+
+
+def test_face_loop_crosses_the_rows():
+    topology = MeshTopology.from_faces(cylinder(8, 3))
+    edge = [int(edge) for edge in topology.face_edges(8) if edge_rows(topology, [edge], 8) == set([(1, 1)])][0]
+    assert members(topology.face_loop(8, edge)) == set([0, 16])
+
+
+def test_checker_single_edge_on_closed_loop():
+    topology = MeshTopology.from_faces(cylinder(8, 3))
+    edge = [int(edge) for edge in topology.face_edges(8) if edge_rows(topology, [edge], 8) == set([(1, 1)])][0]
+    pattern = checker_components(topology, 'e', [edge])
+    assert len(pattern) == 4
+    assert edge in pattern
+    vertices = topology.edge_vertices[pattern].ravel()
+    assert len(set(vertices.tolist())) == 8
+
+
+def test_checker_spacing_from_two_edges():
+    topology = MeshTopology.from_faces(grid(8, 1))
+    loop = topology.loop(0).tolist()
+    pattern = checker_components(topology, 'e', [loop[0], loop[3]])
+    assert sorted(pattern) == sorted(loop[::3])
+
+
+def test_checker_inverted_from_a_gap():
+    topology = MeshTopology.from_faces(cylinder(8, 3))
+    edge = [int(edge) for edge in topology.face_edges(8) if edge_rows(topology, [edge], 8) == set([(1, 1)])][0]
+    loop = set(topology.loop(edge).tolist())
+    forward = topology.edge_loop(edge)[0]
+    gap = set([edge, forward[1]])
+    pattern = checker_components(topology, 'e', sorted(loop - gap))
+    assert len(pattern) == 4
+    assert not set(pattern) & gap
+    assert set(pattern) <= loop
+
+
+def test_checker_rejects_unaligned_selection():
+    topology = MeshTopology.from_faces(grid(4, 3))
+    loop_and_ring = set(topology.loop(0).tolist()) | set(topology.ring(0).tolist())
+    other = [edge for edge in range(topology.num_edges) if edge not in loop_and_ring][0]
+    assert checker_components(topology, 'e', [0, other]) is None
+
+
+def test_to_edges_border_of_faces():
+    topology = MeshTopology.from_faces(grid(4, 3))
+    inner = set(topology.face_edges(0)) & set(topology.face_edges(1))
+    border = topology.to_edges('f', np.array([0, 1]), border=True)
+    everything = topology.to_edges('f', np.array([0, 1]))
+    assert len(everything) == 7
+    assert set(border.tolist()) == set(everything.tolist()) - inner
+
+
+def test_gather():
+    offsets = np.array([0, 2, 2, 5])
+    ids = np.array([10, 11, 20, 21, 22])
+    assert gather(offsets, ids, np.array([2, 0])).tolist() == [20, 21, 22, 10, 11]
+    assert gather(offsets, ids, np.array([1])).tolist() == []
+    assert gather(offsets, ids, np.array([], dtype=np.int64)).tolist() == []
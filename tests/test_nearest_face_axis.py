@@ -0,0 +1,45 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agt_core import nearest_face_axis
+
+
+def transform(translate=(0, 0, 0), rotate_z=0.0, scale=1.0):
+    '''
+    maya style (row vector) matrix
+    '''
+    cos, sin = np.cos(np.radians(rotate_z)), np.sin(np.radians(rotate_z))
+    matrix = np.identity(4)
+    matrix[:3, :3] = np.array([[cos, sin, 0], [-sin, cos, 0], [0, 0, 1]]) * scale
+    matrix[3, :3] = translate
+    return matrix
+
+
+def world_pivot(matrix, point):
+    return (np.append(point, 1.0) @ matrix)[:3]
+
+
+def test_pivot_on_a_face_picks_its_axis():
+    boxes = [((0, -1, -1), (2, 1, 1)), ((-1, 0, -1), (1, 2, 1)), ((-1, -1, -2), (1, 1, 0))]
+    for expected, (bbox_min, bbox_max) in enumerate(boxes):
+        axis = nearest_face_axis(bbox_min, bbox_max, np.identity(4), (0, 0, 0))
+        assert axis.tolist() == [expected]
+
+
+def test_result_follows_the_object_through_its_transform():
+    bbox_min, bbox_max = (-1, 0, -1), (1, 2, 1)
+    for matrix in [transform((10, 5, 3)), transform(rotate_z=90), transform((4, 0, 0), 30, 2.5)]:
+        pivot = world_pivot(matrix, (0, 0, 0))
+        assert nearest_face_axis(bbox_min, bbox_max, matrix, pivot).tolist() == [1]
+
+
+def test_many_objects_at_once():
+    bbox_min = [(0, -1, -1), (-1, 0, -1), (-1, -1, -2)]
+    bbox_max = [(2, 1, 1), (1, 2, 1), (1, 1, 0)]
+    matrices = [transform((1, 2, 3)), transform(rotate_z=45), transform(scale=3)]
+    pivots = [world_pivot(matrix, (0, 0, 0)) for matrix in matrices]
+    assert nearest_face_axis(bbox_min, bbox_max, matrices, pivots).tolist() == [0, 1, 2]
@@ -0,0 +1,82 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agt_core import plan_renames, resolve_name_conflict
+
+
+def make_items(scene, renames):
+    '''
+    rename items for {uid: (parent, name)} scene nodes and {uid: new name}
+    '''
+    return [{'uid': uid, 'parent': scene[uid][0], 'name': scene[uid][1], 'new_name': new_name}
+            for uid, new_name in renames.items()]
+
+
+def sibling_names(scene):
+    siblings = {}
+    for parent, name in scene.values():
+        siblings.setdefault(parent, set()).add(name)
+    return siblings
+
+
+def apply_steps(scene, steps):
+    '''
+    run the steps on the fake scene, failing on any step that would clash
+    '''
+    scene = dict(scene)
+    for uid, name in steps:
+        parent = scene[uid][0]
+        taken = set(other_name for other_uid, (other_parent, other_name) in scene.items()
+                    if other_parent == parent and other_uid != uid)
+        assert name not in taken, 'step {} -> {} clashes'.format(uid, name)
+        scene[uid] = (parent, name)
+    return scene
+
+
+def test_resolve_name_conflict():
+    assert resolve_name_conflict('a', set()) == 'a'
+    assert resolve_name_conflict('a', set(['a'])) == 'a1'
+    assert resolve_name_conflict('a01', set(['a01', 'a02'])) == 'a03'
+
+
+def test_swap_goes_through_a_temporary_name():
+    scene = {'1': ('|g', 'A'), '2': ('|g', 'B')}
+    steps = plan_renames(make_items(scene, {'1': 'B', '2': 'A'}), sibling_names(scene))
+    result = apply_steps(scene, steps)
+    assert result == {'1': ('|g', 'B'), '2': ('|g', 'A')}
+    assert len(steps) == 3
+
+
+def test_chain_is_ordered_without_temporary_names():
+    scene = {'1': ('|g', 'a'), '2': ('|g', 'b'), '3': ('|g', 'c')}
+    steps = plan_renames(make_items(scene, {'1': 'b', '2': 'c', '3': 'd'}), sibling_names(scene))
+    assert apply_steps(scene, steps) == {'1': ('|g', 'b'), '2': ('|g', 'c'), '3': ('|g', 'd')}
+    assert len(steps) == 3
+
+
+def test_clash_with_node_outside_the_batch_is_numbered():
+    scene = {'1': ('|g', 'a'), '2': ('|g', 'body')}
+    items = make_items(scene, {'1': 'body'})
+    steps = plan_renames(items, sibling_names(scene))
+    assert apply_steps(scene, steps)['1'] == ('|g', 'body1')
+    assert items[0]['new_name'] == 'body1'
+
+
+def test_same_name_under_different_parents_is_allowed():
+    scene = {'1': ('|g1', 'a'), '2': ('|g2', 'b')}
+    steps = plan_renames(make_items(scene, {'1': 'body', '2': 'body'}), sibling_names(scene))
+    assert apply_steps(scene, steps) == {'1': ('|g1', 'body'), '2': ('|g2', 'body')}
+
+
+def test_duplicate_new_names_in_the_batch_are_numbered():
+    scene = {'1': ('|g', 'a'), '2': ('|g', 'b'), '3': ('|g', 'c')}
+    steps = plan_renames(make_items(scene, {'1': 'x', '2': 'x', '3': 'x'}), sibling_names(scene))
+    names = sorted(name for parent, name in apply_steps(scene, steps).values())
+    assert names == ['x', 'x1', 'x2']
+
+
+def test_unchanged_names_produce_no_steps():
+    scene = {'1': ('|g', 'a')}
+    assert plan_renames(make_items(scene, {'1': 'a'}), sibling_names(scene)) == []